@@ -5,23 +5,84 @@ Integration examples showing how to use IndexTTS API with:
 - Custom Python applications
 """
 
-import requests
-import json
+import asyncio
+import os
+import httpx
+import msgpack
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
 API_URL = "http://localhost:5150"
+MSGPACK = "application/msgpack"
 
+# Tag spelling for the canonical emotions (looked up instead of str.capitalize per call)
+CAP_EMOTION = {
+    "happy": "Happy",
+    "angry": "Angry",
+    "sad": "Sad",
+    "afraid": "Afraid",
+    "disgusted": "Disgusted",
+    "melancholic": "Melancholic",
+    "surprised": "Surprised",
+    "calm": "Calm",
+}
 
-# ==================== Trivok Integration ====================
 
-class TrivokIndexTTSIntegration:
-    """Example: How Trivok would integrate with IndexTTS API"""
+def _emotion_tag(emotion: str, intensity: int) -> str:
+    """Build an emotion tag such as [Happy:80]"""
+    # Tags are case-insensitive server side, so aliases pass through as-is
+    return f"[{CAP_EMOTION.get(emotion, emotion)}:{intensity}]"
+
+# Size of each chunk when streaming media uploads (override for slow/fast links)
+UPLOAD_CHUNK_SIZE_MB = int(os.environ.get("INDEXTTS_UPLOAD_CHUNK_SIZE_MB", "16"))
+
+
+async def _chunk_gen(path: str, chunk_mb: int = UPLOAD_CHUNK_SIZE_MB):
+    """Yield a media file in fixed-size chunks for chunked transfer encoding"""
+    chunk_size = chunk_mb * 1024 * 1024
+    with open(path, "rb") as f:
+        while chunk := await asyncio.to_thread(f.read, chunk_size):
+            yield chunk
+
+
+def _stream_params(**fields) -> Dict[str, str]:
+    """Drop unset fields so they are not sent as empty query parameters"""
+    return {k: str(v) for k, v in fields.items() if v is not None}
+
+
+def _new_client(api_url: str) -> httpx.AsyncClient:
+    """Create a pooled client so repeated calls reuse keep-alive connections"""
+    return httpx.AsyncClient(
+        base_url=api_url,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=30.0,
+    )
+
+
+class _AsyncAPIClient:
+    """Shared connection handling for the example integrations"""
     
     def __init__(self, api_url: str = API_URL):
         self.api_url = api_url
+        self._client = _new_client(api_url)
     
-    def extract_voice_from_recording(
+    async def aclose(self) -> None:
+        """Close the underlying connection pool"""
+        await self._client.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+
+# ==================== Trivok Integration ====================
+
+class TrivokIndexTTSIntegration(_AsyncAPIClient):
+    """Example: How Trivok would integrate with IndexTTS API"""
+    
+    async def extract_voice_from_recording(
         self,
         media_path: str,
         voice_name: str,
@@ -35,17 +96,20 @@ class TrivokIndexTTSIntegration:
         """
         print(f"[Trivok] Extracting voice from {media_path}...")
         
-        with open(media_path, "rb") as f:
-            response = requests.post(
-                f"{self.api_url}/api/extract",
-                files={"file": f},
-                data={
-                    "voice_name": voice_name,
-                    "description": description or f"Extracted by Trivok from {Path(media_path).name}",
-                    "start_time": start_time,
-                    "end_time": end_time,
-                }
-            )
+        # Stream the file as the raw request body so memory stays at one chunk
+        response = await self._client.post(
+            "/api/extract/stream",
+            content=_chunk_gen(media_path),
+            params=_stream_params(
+                voice_name=voice_name,
+                filename=Path(media_path).name,
+                description=description or f"Extracted by Trivok from {Path(media_path).name}",
+                start_time=start_time,
+                end_time=end_time,
+            ),
+            headers={"Content-Type": "application/octet-stream"},
+            timeout=None,
+        )
         
         if response.status_code == 201:
             result = response.json()
@@ -55,7 +119,7 @@ class TrivokIndexTTSIntegration:
             print(f"[Trivok] ✗ Extraction failed: {response.text}")
             raise Exception(f"Voice extraction failed: {response.text}")
     
-    def speak_with_emotion(
+    async def speak_with_emotion(
         self,
         voice_id: str,
         text: str,
@@ -68,8 +132,8 @@ class TrivokIndexTTSIntegration:
         final_text = emotion_tags if emotion_tags else text
         print(f"[Trivok] Synthesizing: {final_text}")
         
-        response = requests.post(
-            f"{self.api_url}/api/synthesize",
+        response = await self._client.post(
+            "/api/synthesize",
             json={
                 "voice_id": voice_id,
                 "text": final_text,
@@ -80,15 +144,15 @@ class TrivokIndexTTSIntegration:
         if response.status_code == 200:
             result = response.json()
             print(f"[Trivok] ✓ Audio created: {result['audio_file']}")
-            print(f"[Trivok] Emotions applied: {result['emotions_applied']}")
+            print(f"[Trivok] Emotion vector applied: {result['emotion_vector']}")
             return result
         else:
             print(f"[Trivok] ✗ Synthesis failed: {response.text}")
             raise Exception(f"Speech synthesis failed: {response.text}")
     
-    def list_available_voices(self) -> list:
+    async def list_available_voices(self) -> list:
         """List all available voices in IndexTTS library"""
-        response = requests.get(f"{self.api_url}/api/voices")
+        response = await self._client.get("/api/voices")
         
         if response.status_code == 200:
             data = response.json()
@@ -104,13 +168,10 @@ class TrivokIndexTTSIntegration:
 
 # ==================== Home Assistant Integration ====================
 
-class HomeAssistantIndexTTSIntegration:
+class HomeAssistantIndexTTSIntegration(_AsyncAPIClient):
     """Example: How Home Assistant would integrate with IndexTTS API"""
     
-    def __init__(self, api_url: str = API_URL):
-        self.api_url = api_url
-    
-    def announce_with_emotion(
+    async def announce_with_emotion(
         self,
         message: str,
         voice_id: str = "home_voice",
@@ -129,12 +190,12 @@ class HomeAssistantIndexTTSIntegration:
           intensity: 80
         """
         # Construct emotion tag
-        emotion_tagged = f"[{emotion.capitalize()}:{intensity}]{message}"
+        emotion_tagged = _emotion_tag(emotion, intensity) + message
         
         print(f"[HomeAssistant] Announcing: {emotion_tagged}")
         
-        response = requests.post(
-            f"{self.api_url}/api/synthesize",
+        response = await self._client.post(
+            "/api/synthesize",
             json={
                 "voice_id": voice_id,
                 "text": emotion_tagged,
@@ -150,6 +211,38 @@ class HomeAssistantIndexTTSIntegration:
         else:
             raise Exception(f"Synthesis failed: {response.text}")
     
+    async def announce_batch(
+        self,
+        announcements: List[Tuple[str, str, int]],
+        voice_id: str = "home_voice",
+    ) -> List[str]:
+        """
+        Synthesize several (message, emotion, intensity) announcements
+        with a single request to the batch endpoint.
+        """
+        payload = [
+            {
+                "voice_id": voice_id,
+                "text": _emotion_tag(emotion, intensity) + message,
+                "output_format": "wav",
+            }
+            for message, emotion, intensity in announcements
+        ]
+        
+        print(f"[HomeAssistant] Announcing batch of {len(payload)}")
+        
+        # Batches are sent and received as MessagePack (smaller than JSON)
+        response = await self._client.post(
+            "/api/synthesize/batch",
+            content=msgpack.packb(payload),
+            headers={"Content-Type": MSGPACK, "Accept": MSGPACK},
+        )
+        
+        if response.status_code == 200:
+            return [result["audio_file"] for result in msgpack.unpackb(response.content)]
+        else:
+            raise Exception(f"Batch synthesis failed: {response.text}")
+    
     def get_emotion_for_status(self, status: str) -> tuple:
         """
         Map Home Assistant entities to emotions.
@@ -171,13 +264,10 @@ class HomeAssistantIndexTTSIntegration:
 
 # ==================== Custom Python Application ====================
 
-class IndexTTSClient:
+class IndexTTSClient(_AsyncAPIClient):
     """Simple Python client for IndexTTS API"""
     
-    def __init__(self, api_url: str = API_URL):
-        self.api_url = api_url
-    
-    def create_voice_from_media(
+    async def create_voice_from_media(
         self,
         media_path: str,
         voice_name: str,
@@ -185,23 +275,94 @@ class IndexTTSClient:
         end_sec: Optional[float] = None,
     ) -> str:
         """Clone a voice from media file and return voice_id"""
-        with open(media_path, "rb") as f:
-            response = requests.post(
-                f"{self.api_url}/api/extract",
-                files={"file": f},
-                data={
-                    "voice_name": voice_name,
-                    "start_time": start_sec,
-                    "end_time": end_sec,
-                }
-            )
+        response = await self._client.post(
+            "/api/extract/stream",
+            content=_chunk_gen(media_path),
+            params=_stream_params(
+                voice_name=voice_name,
+                filename=Path(media_path).name,
+                start_time=start_sec,
+                end_time=end_sec,
+            ),
+            headers={"Content-Type": "application/octet-stream"},
+            timeout=None,
+        )
+        
+        if response.status_code != 201:
+            raise Exception(f"Extraction failed: {response.text}")
+        
+        return response.json()["voice_id"]
+    
+    async def upload_multipart(
+        self,
+        media_path: str,
+        voice_name: str,
+        start_sec: Optional[float] = None,
+        end_sec: Optional[float] = None,
+        part_mb: int = UPLOAD_CHUNK_SIZE_MB,
+        parallel: int = 4,
+        retries: int = 3,
+    ) -> str:
+        """
+        Clone a voice from a large media file with a resumable upload
         
+        Parts are sent concurrently (up to `parallel` at a time) and a part
+        that fails is retried on its own instead of restarting the upload.
+        """
+        response = await self._client.post(
+            "/api/extract/uploads",
+            json={
+                "voice_name": voice_name,
+                "filename": Path(media_path).name,
+                "start_time": start_sec,
+                "end_time": end_sec,
+            },
+        )
+        response.raise_for_status()
+        upload_id = response.json()["upload_id"]
+        
+        part_size = part_mb * 1024 * 1024
+        total = os.path.getsize(media_path)
+        semaphore = asyncio.Semaphore(parallel)
+        
+        def read_part(offset: int) -> bytes:
+            with open(media_path, "rb") as f:
+                f.seek(offset)
+                return f.read(part_size)
+        
+        async def put_part(n: int, offset: int) -> None:
+            async with semaphore:
+                data = await asyncio.to_thread(read_part, offset)
+                for attempt in range(retries):
+                    try:
+                        part = await self._client.put(
+                            f"/api/extract/uploads/{upload_id}/parts/{n}",
+                            content=data,
+                            headers={
+                                "Content-Type": "application/octet-stream",
+                                "Content-Range": f"bytes {offset}-{offset + len(data) - 1}/{total}",
+                            },
+                            timeout=None,
+                        )
+                        part.raise_for_status()
+                        return
+                    except httpx.HTTPError:
+                        if attempt == retries - 1:
+                            raise
+        
+        await asyncio.gather(*[
+            put_part(n, offset) for n, offset in enumerate(range(0, total, part_size))
+        ])
+        
+        response = await self._client.post(
+            f"/api/extract/uploads/{upload_id}/complete", timeout=None
+        )
         if response.status_code != 201:
             raise Exception(f"Extraction failed: {response.text}")
         
         return response.json()["voice_id"]
     
-    def speak(
+    async def speak(
         self,
         voice_id: str,
         text: str,
@@ -210,16 +371,14 @@ class IndexTTSClient:
         """Synthesize speech with optional emotions"""
         # Build emotion-tagged text
         if emotions:
-            # Convert emotion dict to tags
-            emotion_text = text
-            for emotion, intensity in emotions.items():
-                emotion_text = f"[{emotion.capitalize()}:{intensity}]{emotion_text}"
-            final_text = emotion_text
+            # All tags precede the text, so build them in one pass
+            tags = "".join(_emotion_tag(emotion, intensity) for emotion, intensity in emotions.items())
+            final_text = tags + text
         else:
             final_text = text
         
-        response = requests.post(
-            f"{self.api_url}/api/synthesize",
+        response = await self._client.post(
+            "/api/synthesize",
             json={
                 "voice_id": voice_id,
                 "text": final_text,
@@ -231,9 +390,9 @@ class IndexTTSClient:
         
         return response.json()["audio_file"]
     
-    def get_voices(self) -> list:
+    async def get_voices(self) -> list:
         """Get all available voices"""
-        response = requests.get(f"{self.api_url}/api/voices")
+        response = await self._client.get("/api/voices")
         
         if response.status_code != 200:
             raise Exception(f"Failed to get voices: {response.text}")
@@ -243,39 +402,36 @@ class IndexTTSClient:
 
 # ==================== Example Usage ====================
 
-def example_trivok_workflow():
+async def example_trivok_workflow():
     """Example: How Trivok would use IndexTTS"""
     print("\n" + "="*60)
     print("TRIVOK INTEGRATION EXAMPLE")
     print("="*60)
     
-    trivok = TrivokIndexTTSIntegration()
-    
-    # Step 1: User uploads a video and says "Extract my voice"
-    # trivok.extract_voice_from_recording(
-    #     "my_video.mp4",
-    #     "john_smith",
-    #     description="John's natural speaking voice"
-    # )
-    
-    # Step 2: User says "Use my voice to say [Happy:80]Hello![Calm:60] How are you?"
-    # trivok.speak_with_emotion(
-    #     "voice_from_step1",
-    #     "[Happy:80]Hello![Calm:60] How are you?"
-    # )
-    
-    # Step 3: Show available voices
-    trivok.list_available_voices()
+    async with TrivokIndexTTSIntegration() as trivok:
+        # Step 1: User uploads a video and says "Extract my voice"
+        # await trivok.extract_voice_from_recording(
+        #     "my_video.mp4",
+        #     "john_smith",
+        #     description="John's natural speaking voice"
+        # )
+        
+        # Step 2: User says "Use my voice to say [Happy:80]Hello![Calm:60] How are you?"
+        # await trivok.speak_with_emotion(
+        #     "voice_from_step1",
+        #     "[Happy:80]Hello![Calm:60] How are you?"
+        # )
+        
+        # Step 3: Show available voices
+        await trivok.list_available_voices()
 
 
-def example_home_assistant_automation():
+async def example_home_assistant_automation():
     """Example: How Home Assistant would use IndexTTS"""
     print("\n" + "="*60)
     print("HOME ASSISTANT INTEGRATION EXAMPLE")
     print("="*60)
     
-    ha = HomeAssistantIndexTTSIntegration()
-    
     # Example automations
     announcements = [
         ("Coffee is ready!", "happy", 80),
@@ -284,83 +440,97 @@ def example_home_assistant_automation():
         ("System maintenance complete.", "calm", 80),
     ]
     
-    for message, emotion, intensity in announcements:
-        try:
-            audio_path = ha.announce_with_emotion(
-                message,
-                emotion=emotion,
-                intensity=intensity
-            )
-            print(f"✓ Generated: {audio_path}\n")
-        except Exception as e:
-            print(f"✗ Error: {e}\n")
+    async with HomeAssistantIndexTTSIntegration() as ha:
+        # Each automation fires independently, so run them concurrently;
+        # one failed announcement does not hold back or cancel the others
+        results = await asyncio.gather(
+            *[
+                ha.announce_with_emotion(message, emotion=emotion, intensity=intensity)
+                for message, emotion, intensity in announcements
+            ],
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"✗ Error: {result}\n")
+            else:
+                print(f"✓ Generated: {result}\n")
 
 
-def example_custom_python():
+async def example_custom_python():
     """Example: Using IndexTTS from Python"""
     print("\n" + "="*60)
     print("PYTHON CLIENT EXAMPLE")
     print("="*60)
     
-    client = IndexTTSClient()
-    
-    try:
-        # Get existing voices
-        voices = client.get_voices()
-        print(f"Available voices: {len(voices)}")
-        
-        # Use first voice if available
-        if voices:
-            voice_id = voices[0]["voice_id"]
+    async with IndexTTSClient() as client:
+        try:
+            # Get existing voices
+            voices = await client.get_voices()
+            print(f"Available voices: {len(voices)}")
             
-            # Synthesize with emotions
-            audio_file = client.speak(
-                voice_id,
-                "This is a test message",
-                emotions={"happy": 70, "calm": 30}
-            )
-            print(f"Generated audio: {audio_file}")
-    
-    except Exception as e:
-        print(f"Error: {e}")
+            # Use first voice if available
+            if voices:
+                voice_id = voices[0]["voice_id"]
+                
+                # Synthesize with emotions
+                audio_file = await client.speak(
+                    voice_id,
+                    "This is a test message",
+                    emotions={"happy": 70, "calm": 30}
+                )
+                print(f"Generated audio: {audio_file}")
+        
+        except Exception as e:
+            print(f"Error: {e}")
 
 
 # ==================== API Health Check ====================
 
-def check_api_health():
+# ETag of the last health response, sent back so the server can answer 304
+_last_health_etag: Optional[str] = None
+
+
+async def check_api_health():
     """Check if IndexTTS API is running"""
+    global _last_health_etag
     print("\n" + "="*60)
     print("API HEALTH CHECK")
     print("="*60)
     
+    headers = {"If-None-Match": _last_health_etag} if _last_health_etag else {}
     try:
-        response = requests.get(f"{API_URL}/health", timeout=5)
+        async with _new_client(API_URL) as client:
+            # HEAD carries no body; status and ETag are all a probe needs
+            response = await client.head("/api/health", headers=headers, timeout=5)
         
-        if response.status_code == 200:
-            health = response.json()
-            print(f"✓ API is running on port {health['port']}")
-            print(f"  Service: {health['service']}")
-            print(f"  Version: {health['version']}")
+        if response.status_code in (200, 304):
+            _last_health_etag = response.headers.get("etag", _last_health_etag)
+            print(f"✓ API is running at {API_URL}")
             return True
         else:
             print(f"✗ API returned status code: {response.status_code}")
             return False
     
-    except requests.ConnectionError:
+    except httpx.ConnectError:
         print(f"✗ Cannot connect to {API_URL}")
         print(f"   Make sure the API is running:")
         print(f"   python -m indextts_app.api.main")
         return False
 
 
-if __name__ == "__main__":
+async def main():
     # Check API availability first
-    if not check_api_health():
+    if not await check_api_health():
         print("\nPlease start the API server first:")
         print("  PYTHONPATH='$PYTHONPATH:.' python -m indextts_app.api.main")
         exit(1)
     
     # Run examples
-    example_trivok_workflow()
-    example_home_assistant_automation()
-    example_custom_python()
+    await example_trivok_workflow()
+    await example_home_assistant_automation()
+    await example_custom_python()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
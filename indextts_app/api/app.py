@@ -2,22 +2,54 @@
 
 from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+from pathlib import Path
+import asyncio
 import logging
+import os
 
-from .routes import voices, extract, synthesize, health
+from ..utils import TTSSynthesizer
+from .routes import voices, extract, extract_multipart, synthesize, health
+from .batching import synthesis_pool
+from .cache import SynthesisCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Model settings (see main.py for the environment variables)
+CONFIG_PATH = Path(os.environ.get("INDEXTTS_CONFIG", "./checkpoints/config.yaml"))
+MODEL_DIR = Path(os.environ.get("INDEXTTS_MODEL_DIR", "./checkpoints"))
+PRECISION = os.environ.get("INDEXTTS_PRECISION", "fp16")
+BACKEND = os.environ.get("INDEXTTS_BACKEND", "torch")
+USE_TORCH_COMPILE = os.environ.get("INDEXTTS_TORCH_COMPILE", "0") == "1"
+WARMUP_VOICE = os.environ.get("INDEXTTS_WARMUP_VOICE")
+CACHE_DIR = Path(os.environ.get("INDEXTTS_CACHE_DIR", "./audio_cache"))
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage app lifecycle - startup and shutdown"""
     logger.info("IndexTTS API Service starting on port 5150...")
+    # Load (and optionally warm up) the model before serving, so the first
+    # request does not pay the cold start
+    app.state.synth = await asyncio.to_thread(
+        TTSSynthesizer,
+        CONFIG_PATH,
+        MODEL_DIR,
+        precision=PRECISION,
+        backend=BACKEND,
+        use_torch_compile=USE_TORCH_COMPILE,
+    )
+    if WARMUP_VOICE:
+        logger.info(f"Warming up model with {WARMUP_VOICE}")
+        await asyncio.to_thread(app.state.synth.warmup, WARMUP_VOICE)
+    app.state.synthesis_cache = await asyncio.to_thread(SynthesisCache, CACHE_DIR)
+    synthesis_pool.start()
     yield
     logger.info("IndexTTS API Service shutting down...")
+    await synthesis_pool.stop()
 
 
 def create_app() -> FastAPI:
@@ -31,6 +63,7 @@ def create_app() -> FastAPI:
         redoc_url="/redoc",
         openapi_url="/openapi.json",
         lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
     
     # Add CORS middleware for integration with web UIs (Trivok, Home Assistant, etc.)
@@ -49,6 +82,7 @@ def create_app() -> FastAPI:
     api_router.include_router(health.router)
     api_router.include_router(voices.router)
     api_router.include_router(extract.router)
+    api_router.include_router(extract_multipart.router)
     api_router.include_router(synthesize.router)
     
     app.include_router(api_router)
@@ -0,0 +1,142 @@
+"""Request pooling for speech synthesis
+
+Concurrent /api/synthesize calls are placed into a shared pool that a single
+background loop drains. Each drain groups pending items by voice so consecutive
+inferences reuse IndexTTS2's cached speaker conditioning instead of re-encoding
+the reference audio for every request.
+
+Jobs run one at a time on a dedicated worker thread (PyTorch releases the GIL
+inside its kernels), so the event loop stays free to accept requests while the
+model works. A single IndexTTS2 instance is not re-entrant: concurrent jobs
+would overwrite each other's speaker-conditioning cache. The loop hands the
+worker one job at a time, so requests arriving meanwhile stay in the pool and
+are grouped with the rest.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolItem:
+    """A synthesis job waiting in the pool"""
+    voice_id: str
+    job: Callable[[], Any]
+    result_future: asyncio.Future
+
+
+class SynthesisPool:
+    """Pool of in-flight synthesis requests served by one batching loop"""
+
+    def __init__(self, max_batch_size: int = 16):
+        """
+        Initialize the pool
+
+        Args:
+            max_batch_size: Maximum number of items taken per loop iteration
+        """
+        self.max_batch_size = max_batch_size
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="synthesis")
+        self._pool: Dict[int, PoolItem] = {}
+        self._ids = count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Semaphore] = None
+        self._running: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the background batching loop (call from the app lifespan)"""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._idle = asyncio.Semaphore(1)
+            self._task = asyncio.create_task(self._batching_loop())
+
+    async def stop(self) -> None:
+        """Stop the batching loop and fail any requests still pending"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        for item in self._pool.values():
+            if not item.result_future.done():
+                item.result_future.set_exception(RuntimeError("Synthesis service shutting down"))
+        self._pool.clear()
+
+    async def submit(self, voice_id: str, job: Callable[[], Any]) -> Any:
+        """
+        Queue a blocking synthesis job and wait for its result
+
+        Args:
+            voice_id: Voice the job synthesizes with (used for grouping)
+            job: Zero-argument callable performing the synthesis
+
+        Returns:
+            Whatever the job returns
+        """
+        if self._task is None:
+            # Loop not running (e.g. used outside the app lifespan)
+            return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+
+        item = PoolItem(
+            voice_id=voice_id,
+            job=job,
+            result_future=asyncio.get_running_loop().create_future(),
+        )
+        self._pool[next(self._ids)] = item
+        self._wakeup.set()
+        return await item.result_future
+
+    def _take_batch(self) -> List[PoolItem]:
+        """Remove the next batch from the pool, grouped by voice"""
+        # Voices are served in order of their oldest pending request
+        voice_rank: Dict[str, int] = {}
+        for item in self._pool.values():
+            voice_rank.setdefault(item.voice_id, len(voice_rank))
+
+        order = sorted(self._pool, key=lambda req_id: (voice_rank[self._pool[req_id].voice_id], req_id))
+        return [self._pool.pop(req_id) for req_id in order[:self.max_batch_size]]
+
+    async def _batching_loop(self) -> None:
+        """Drain the pool, dispatching items in batch order as the worker frees up"""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while self._pool:
+                batch = self._take_batch()
+                logger.debug(f"Running synthesis batch of {len(batch)} item(s)")
+                for item in batch:
+                    if item.result_future.done():
+                        # Caller went away (request cancelled)
+                        continue
+                    await self._idle.acquire()
+                    task = asyncio.create_task(self._run(item))
+                    self._running.add(task)
+                    task.add_done_callback(self._running.discard)
+
+    async def _run(self, item: PoolItem) -> None:
+        """Run one item on the worker and mark it idle again"""
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, item.job)
+        except Exception as e:
+            if not item.result_future.done():
+                item.result_future.set_exception(e)
+        else:
+            if not item.result_future.done():
+                item.result_future.set_result(result)
+        finally:
+            self._idle.release()
+
+
+# Shared pool used by the synthesis routes
+synthesis_pool = SynthesisPool()
@@ -0,0 +1,162 @@
+"""Content-addressed cache for synthesized audio
+
+Repeated announcements ("Coffee is ready!") map to the same key, so the audio
+is generated once and later requests are served straight from disk.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different inputs share a cache entry"""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def synthesis_cache_key(
+    voice_id: str,
+    text: str,
+    emotion_vector: Optional[Sequence[float]] = None,
+    output_format: str = "wav",
+) -> str:
+    """
+    Build the cache key for a synthesis request
+
+    The key is taken over what the model actually receives (tag-free text and
+    the parsed emotion vector) rather than the raw request text, so spellings
+    of the same tags such as "[Happy:80]" and "[happy:80.0]" share an entry.
+
+    Args:
+        voice_id: Voice used for synthesis
+        text: Text with emotion tags removed
+        emotion_vector: Emotion intensities (None for neutral)
+        output_format: Requested audio format
+
+    Returns:
+        Hex digest identifying the audio
+    """
+    emotions = "" if emotion_vector is None else ",".join(f"{v:.4f}" for v in emotion_vector)
+    data = f"{voice_id}|{normalize_text(text)}|{emotions}|{output_format}"
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+class SynthesisCache:
+    """On-disk LRU cache of synthesized audio files (one per key, named key.<format>)"""
+
+    def __init__(self, cache_dir: Path, max_entries: int = 1024):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory holding cached audio files
+            max_entries: Maximum number of cached files before LRU eviction
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # File name -> path of every cached file, least recently used first;
+        # get/put run on worker threads, so the index has its own lock
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, Path]" = OrderedDict(
+            (path.name, path) for path in self._scan()
+        )
+
+    def _scan(self) -> List[Path]:
+        """Cached files on disk, oldest modification first"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".part"):
+                continue
+            try:
+                entries.append((entry.stat().st_mtime, Path(entry.path)))
+            except FileNotFoundError:
+                continue
+        return [path for _, path in sorted(entries)]
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.cache_dir / f"{key}{suffix}"
+
+    def get(self, key: str, suffix: str = ".wav") -> Optional[Path]:
+        """Return the cached file for key (marking it recently used), or None"""
+        path = self._path(key, suffix)
+        with self._lock:
+            if path.name not in self._index:
+                return None
+            self._index.move_to_end(path.name)
+        try:
+            # Keeps the LRU order for the scan on the next start
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._index.pop(path.name, None)
+            return None
+        return path
+
+    def put(self, key: str, audio_path: Union[str, Path]) -> Path:
+        """Move a produced audio file into the cache (keeping its extension) and evict old entries"""
+        path = self._path(key, Path(audio_path).suffix)
+        tmp_path = path.with_suffix(".part")
+        shutil.move(str(audio_path), tmp_path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._index[path.name] = path
+            self._index.move_to_end(path.name)
+            stale = [
+                self._index.popitem(last=False)[1]
+                for _ in range(len(self._index) - self.max_entries)
+            ]
+        # Least recently used files beyond max_entries
+        for stale_path in stale:
+            stale_path.unlink(missing_ok=True)
+        return path
+
+    async def get_or_synth(
+        self,
+        key: str,
+        producer: Callable[[], Awaitable[Union[str, Path]]],
+        suffix: str = ".wav",
+    ) -> Path:
+        """
+        Return cached audio for key, synthesizing it on a miss
+
+        Concurrent misses for the same key share a single producer call, so a
+        burst of identical requests triggers one synthesis.
+
+        Args:
+            key: Cache key from synthesis_cache_key()
+            producer: Coroutine function that synthesizes and returns the audio path
+            suffix: Extension of the audio file, e.g. ".mp3"
+
+        Returns:
+            Path to the cached audio file
+        """
+        cached = await asyncio.to_thread(self.get, key, suffix)
+        if cached is not None:
+            return cached
+
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._produce(key, producer))
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one cancelled caller does not abort the shared synthesis
+        return await asyncio.shield(pending)
+
+    async def _produce(
+        self,
+        key: str,
+        producer: Callable[[], Awaitable[Union[str, Path]]],
+    ) -> Path:
+        audio_path = await producer()
+        return await asyncio.to_thread(self.put, key, audio_path)
+
@@ -0,0 +1,40 @@
+"""Shared dependencies for the API routes
+
+Every route module resolves the voice library and extractor through these
+providers, so they all share one instance (and one library version counter).
+Tests can swap an implementation with ``app.dependency_overrides``.
+"""
+
+from fastapi import Request
+from functools import lru_cache
+from pathlib import Path
+import os
+
+from ..utils import TTSSynthesizer
+from .cache import SynthesisCache
+from ..voice_library import VoiceExtractor, VoiceLibraryManager
+
+# Directory holding voice audio and the voice database
+VOICE_DIR = Path(os.environ.get("INDEXTTS_VOICE_DIR", "./voices"))
+
+
+@lru_cache(maxsize=1)
+def get_voice_manager() -> VoiceLibraryManager:
+    """Voice library shared by all routes (created on first use)"""
+    return VoiceLibraryManager(VOICE_DIR)
+
+
+@lru_cache(maxsize=1)
+def get_extractor() -> VoiceExtractor:
+    """Media extractor shared by all routes"""
+    return VoiceExtractor()
+
+
+def get_synthesizer(request: Request) -> TTSSynthesizer:
+    """Synthesizer loaded by the app lifespan"""
+    return request.app.state.synth
+
+
+def get_synthesis_cache(request: Request) -> SynthesisCache:
+    """Synthesized audio cache created by the app lifespan"""
+    return request.app.state.synthesis_cache
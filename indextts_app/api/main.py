@@ -6,6 +6,19 @@ Run with:
 Or with Python:
     python -m indextts_app.api.main
 
+Environment:
+    INDEXTTS_CONFIG      Path to the model config.yaml (default ./checkpoints/config.yaml)
+    INDEXTTS_MODEL_DIR   Directory with the model weights (default ./checkpoints)
+    INDEXTTS_PRECISION   Model precision: fp32, fp16 (default), bf16 or int8 (CPU only)
+    INDEXTTS_BACKEND     Vocoder backend: torch (default) or onnx (needs onnxruntime and
+                         a vocoder exported with python -m indextts_app.export_onnx)
+    INDEXTTS_TORCH_COMPILE  Set to 1 to torch.compile the flow-matching decoder
+    INDEXTTS_WARMUP_VOICE   Reference audio used for one warm-up synthesis at startup
+    INDEXTTS_VOICE_DIR      Voice library directory (default ./voices)
+    INDEXTTS_CACHE_DIR      Synthesized audio cache directory (default ./audio_cache)
+
+    INDEXTTS_PRECISION=bf16 uvicorn indextts_app.api.main:app --host 0.0.0.0 --port 5150
+
 API Documentation:
     http://localhost:5150/docs (Swagger UI)
     http://localhost:5150/redoc (ReDoc)
@@ -1,6 +1,6 @@
 """Request/Response models for the API"""
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, conint, conlist
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -16,6 +16,7 @@ class VoiceProfileResponse(BaseModel):
     source_media: Optional[str] = Field(None, description="Original media file")
     created_at: datetime = Field(..., description="Creation timestamp")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
+    embedding_cached: Optional[bool] = Field(None, description="Whether the speaker conditioning is precomputed")
 
     class Config:
         json_schema_extra = {
@@ -26,7 +27,8 @@ class VoiceProfileResponse(BaseModel):
                 "gender": "male",
                 "source_media": "recording.mp4",
                 "created_at": "2025-11-29T10:30:00",
-                "metadata": {"age": 35, "accent": "neutral"}
+                "metadata": {"age": 35, "accent": "neutral"},
+                "embedding_cached": True
             }
         }
 
@@ -95,14 +97,55 @@ class ExtractResponse(BaseModel):
         }
 
 
+class UploadInitRequest(BaseModel):
+    """Request to start a resumable media upload"""
+    voice_name: str = Field(..., description="Name for the cloned voice")
+    filename: str = Field(..., description="Original media file name")
+    start_time: Optional[float] = Field(None, description="Start time in seconds (optional)")
+    end_time: Optional[float] = Field(None, description="End time in seconds (optional)")
+    description: Optional[str] = Field(None, description="Voice description")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "voice_name": "podcast_host",
+                "filename": "episode_42.mp4",
+                "start_time": 10.5,
+                "end_time": 30.2,
+                "description": "Extracted from podcast episode"
+            }
+        }
+
+
+class UploadStatusResponse(BaseModel):
+    """State of a resumable upload"""
+    upload_id: str = Field(..., description="Upload identifier")
+    parts: List[int] = Field(..., description="Numbers of the parts received so far")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "upload_id": "3f2a9c0e5b7d4e1f8a6b2c9d0e1f2a3b",
+                "parts": [0, 1, 2]
+            }
+        }
+
+
 # ==================== Synthesis Models ====================
 
 class SynthesisRequest(BaseModel):
     """Request to synthesize speech"""
     voice_id: str = Field(..., description="ID of voice to use")
     text: str = Field(..., description="Text to synthesize (can include emotion tags like [Happy:80]text)")
+    emotion: Optional[str] = Field(
+        None,
+        description="Emotion for the whole text, in tag syntax without brackets (e.g. 'Happy:80' or 'Happy:80,Calm:20')",
+    )
     output_format: Optional[str] = Field("wav", description="Output format (wav, mp3, ogg)")
-    speed: Optional[float] = Field(1.0, description="Speech speed multiplier (0.5-2.0)")
+    speed: Optional[float] = Field(
+        1.0, description="Speech speed multiplier (0.5-2.0); accepted but not applied, IndexTTS2 has no speed control"
+    )
+    inline: bool = Field(False, description="Return the audio bytes in the response instead of JSON metadata")
 
     class Config:
         json_schema_extra = {
@@ -120,7 +163,11 @@ class SynthesisResponse(BaseModel):
     audio_file: str = Field(..., description="Path or URL to generated audio")
     duration: float = Field(..., description="Duration in seconds")
     format: str = Field(..., description="Audio format")
-    emotions_applied: Dict[str, int] = Field(..., description="Emotions and intensities applied")
+    emotion_vector: conlist(conint(ge=0, le=100), min_length=8, max_length=8) = Field(
+        ...,
+        description="Highest intensity (0-100) applied per emotion across all segments, in order: "
+                    "happy, angry, sad, afraid, disgusted, melancholic, surprised, calm",
+    )
     message: str = Field(..., description="Status message")
 
     class Config:
@@ -129,7 +176,7 @@ class SynthesisResponse(BaseModel):
                 "audio_file": "/audio/synthesis_12345.wav",
                 "duration": 3.5,
                 "format": "wav",
-                "emotions_applied": {"happy": 80, "calm": 60},
+                "emotion_vector": [80, 0, 0, 0, 0, 0, 0, 60],
                 "message": "Synthesis completed successfully"
             }
         }
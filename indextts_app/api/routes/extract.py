@@ -1,17 +1,23 @@
 """Audio extraction endpoints"""
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, status, Form
-from typing import Optional
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status, Form, Request, Query
+from typing import AsyncIterator, Optional
 
-from ..voice_library import VoiceExtractor, VoiceLibraryManager
-from .models import ExtractRequest, ExtractResponse
+from ...voice_library import VoiceExtractor, VoiceLibraryManager
+from ..deps import get_extractor, get_voice_manager
+from ..models import ExtractRequest, ExtractResponse
+import asyncio
+import os
 import tempfile
 from pathlib import Path
 
-router = APIRouter(prefix="/extract", tags=["Extraction"])
+import aiofiles
+from ..serialization import MsgpackRoute
 
-extractor = VoiceExtractor()
-voice_manager = VoiceLibraryManager()
+router = APIRouter(prefix="/extract", tags=["Extraction"], route_class=MsgpackRoute)
+
+# Size of each read when copying uploads to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
 
 
 @router.post("", response_model=ExtractResponse, status_code=status.HTTP_201_CREATED)
@@ -21,6 +27,8 @@ async def extract_voice(
     start_time: Optional[float] = Form(None, description="Start time in seconds"),
     end_time: Optional[float] = Form(None, description="End time in seconds"),
     description: Optional[str] = Form(None, description="Voice description"),
+    voice_manager: VoiceLibraryManager = Depends(get_voice_manager),
+    extractor: VoiceExtractor = Depends(get_extractor),
 ):
     """
     Extract audio from media file and create a voice profile
@@ -42,47 +50,63 @@ async def extract_voice(
         500: Extraction failed
     """
     try:
-        # Create temporary file for upload
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = Path(tmp.name)
+        # Stream the upload to a temporary file
+        tmp_path = await _save_upload(_read_upload(file), Path(file.filename).suffix)
         
-        # Extract audio
-        try:
-            audio_path = extractor.extract_audio_segment(
-                tmp_path,
-                start_time=start_time,
-                end_time=end_time,
-            )
-            
-            # Create voice profile
-            voice = voice_manager.add_voice(
-                name=voice_name,
-                description=description or f"Extracted from {file.filename}",
-                source_media=file.filename,
-                metadata={
-                    "extraction_start": start_time,
-                    "extraction_end": end_time,
-                    "source_format": Path(file.filename).suffix,
-                },
-            )
-            
-            # Get audio duration
-            info = extractor.get_audio_info(audio_path)
-            duration = float(info.get("duration", 0))
-            
-            return ExtractResponse(
-                voice_id=voice.voice_id,
-                name=voice.name,
-                duration=duration,
-                created_at=voice.created_at,
-                message=f"Voice '{voice_name}' extracted successfully from {file.filename}",
-            )
-        finally:
-            # Cleanup temp file
-            if tmp_path.exists():
-                tmp_path.unlink()
+        return await _create_voice_from_upload(
+            tmp_path,
+            filename=file.filename,
+            voice_name=voice_name,
+            start_time=start_time,
+            end_time=end_time,
+            description=description,
+            voice_manager=voice_manager,
+            extractor=extractor,
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Audio extraction failed: {str(e)}",
+        )
+
+
+@router.post("/stream", response_model=ExtractResponse, status_code=status.HTTP_201_CREATED)
+async def extract_voice_stream(
+    request: Request,
+    voice_name: str = Query(..., description="Name for the cloned voice"),
+    filename: str = Query(..., description="Original media file name"),
+    start_time: Optional[float] = Query(None, description="Start time in seconds"),
+    end_time: Optional[float] = Query(None, description="End time in seconds"),
+    description: Optional[str] = Query(None, description="Voice description"),
+    voice_manager: VoiceLibraryManager = Depends(get_voice_manager),
+    extractor: VoiceExtractor = Depends(get_extractor),
+):
+    """
+    Extract audio from a raw media body and create a voice profile
+    
+    Accepts the media file as an ``application/octet-stream`` body, typically
+    sent with chunked transfer encoding, so very large recordings can be
+    uploaded without a multipart envelope. Form fields move to query parameters.
+    
+    Raises:
+        500: Extraction failed
+    """
+    try:
+        tmp_path = await _save_upload(request.stream(), Path(filename).suffix)
+        
+        return await _create_voice_from_upload(
+            tmp_path,
+            filename=filename,
+            voice_name=voice_name,
+            start_time=start_time,
+            end_time=end_time,
+            description=description,
+            voice_manager=voice_manager,
+            extractor=extractor,
+        )
     
     except HTTPException:
         raise
@@ -91,3 +115,91 @@ async def extract_voice(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Audio extraction failed: {str(e)}",
         )
+
+
+async def _new_temp_path(suffix: str) -> Path:
+    """Reserve a temporary file path for an upload"""
+    fd, name = await asyncio.to_thread(tempfile.mkstemp, suffix=suffix)
+    os.close(fd)
+    return Path(name)
+
+
+async def _read_upload(file: UploadFile) -> AsyncIterator[bytes]:
+    """Chunks of a multipart upload"""
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+
+async def _save_upload(chunks: AsyncIterator[bytes], suffix: str) -> Path:
+    """Stream an upload to a new temp file, removed again if the upload fails"""
+    tmp_path = await _new_temp_path(suffix)
+    try:
+        async with aiofiles.open(tmp_path, "wb") as out:
+            async for chunk in chunks:
+                await out.write(chunk)
+    except BaseException:
+        # Client disconnected mid-upload or the write failed
+        await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+        raise
+    return tmp_path
+
+
+async def _create_voice_from_upload(
+    tmp_path: Path,
+    filename: str,
+    voice_name: str,
+    start_time: Optional[float],
+    end_time: Optional[float],
+    description: Optional[str],
+    voice_manager: VoiceLibraryManager,
+    extractor: VoiceExtractor,
+) -> ExtractResponse:
+    """Extract audio from an uploaded temp file and register the voice"""
+    # The library stores its own copy of the extracted audio
+    audio_path = tmp_path.with_name(tmp_path.stem + ".extracted.wav")
+    try:
+        duration = None
+        if end_time is not None:
+            duration = end_time - (start_time or 0.0)
+        
+        # Extract audio (ffmpeg runs as an asyncio subprocess)
+        success = await extractor.extract_audio_async(
+            tmp_path,
+            audio_path,
+            start_time=start_time,
+            duration=duration,
+        )
+        if not success:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Could not extract audio from {filename}",
+            )
+        
+        # Create voice profile
+        voice = await asyncio.to_thread(
+            voice_manager.add_voice_from_file,
+            name=voice_name,
+            audio_path=audio_path,
+            source_file=filename,
+            description=description or f"Extracted from {filename}",
+            extraction_start=start_time,
+            extraction_end=end_time,
+            source_format=Path(filename).suffix,
+        )
+        if voice is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Voice '{voice_name}' already exists",
+            )
+        
+        return ExtractResponse(
+            voice_id=voice.id,
+            name=voice.name,
+            duration=voice.duration,
+            created_at=voice.created_at,
+            message=f"Voice '{voice_name}' extracted successfully from {filename}",
+        )
+    finally:
+        # Cleanup temp files
+        await asyncio.to_thread(audio_path.unlink, missing_ok=True)
+        await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
@@ -0,0 +1,227 @@
+"""Resumable multipart upload endpoints for audio extraction
+
+Large recordings are uploaded as numbered parts that can be retried (or sent
+in parallel) independently; a failed part is re-sent on its own instead of
+restarting the whole upload. Parts are kept until extraction succeeds, so
+a failed completion can be retried; uploads left untouched for
+UPLOAD_EXPIRY seconds are deleted when the next upload starts.
+
+    POST /extract/uploads                       -> upload_id
+    PUT  /extract/uploads/{upload_id}/parts/{n}  raw part bytes
+    GET  /extract/uploads/{upload_id}            parts received so far
+    POST /extract/uploads/{upload_id}/complete  -> extracted voice
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Path as PathParam, Request, status
+import asyncio
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import List
+
+import aiofiles
+import aiofiles.os
+from ...voice_library import VoiceExtractor, VoiceLibraryManager
+from ..deps import get_extractor, get_voice_manager
+from ..serialization import MsgpackRoute
+from ..models import ExtractResponse, UploadInitRequest, UploadStatusResponse
+from .extract import _create_voice_from_upload, _new_temp_path
+
+router = APIRouter(prefix="/extract/uploads", tags=["Extraction"], route_class=MsgpackRoute)
+
+# Directory holding in-progress uploads (one subdirectory per upload)
+UPLOAD_DIR = Path(os.environ.get("INDEXTTS_UPLOAD_DIR", Path(tempfile.gettempdir()) / "indextts_uploads"))
+
+# Upper bound on part numbers accepted per upload
+MAX_PARTS = 10000
+
+# Seconds after its last part before an abandoned upload is deleted
+UPLOAD_EXPIRY = 24 * 3600
+
+UPLOAD_ID_PATTERN = r"^[0-9a-f]{32}$"
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+_PART_FILE = re.compile(r"part_(\d+)\.bin")
+
+
+@router.post("", response_model=UploadStatusResponse, status_code=status.HTTP_201_CREATED)
+async def init_upload(request: UploadInitRequest):
+    """
+    Start a resumable upload
+
+    Returns:
+        The new upload_id (with no parts received yet)
+    """
+    await asyncio.to_thread(_expire_uploads)
+    upload_id = uuid.uuid4().hex
+    upload_dir = UPLOAD_DIR / upload_id
+    await asyncio.to_thread(upload_dir.mkdir, parents=True)
+    async with aiofiles.open(upload_dir / "meta.json", "w") as f:
+        await f.write(request.model_dump_json())
+    return UploadStatusResponse(upload_id=upload_id, parts=[])
+
+
+@router.put("/{upload_id}/parts/{part_number}", response_model=UploadStatusResponse)
+async def upload_part(
+    request: Request,
+    upload_id: str = PathParam(..., pattern=UPLOAD_ID_PATTERN),
+    part_number: int = PathParam(..., ge=0, lt=MAX_PARTS),
+):
+    """
+    Upload (or re-upload) one part as a raw body
+
+    An optional ``Content-Range: bytes start-end/total`` header is checked
+    against the received size, so truncated parts are rejected and retried.
+
+    Raises:
+        404: Unknown upload
+        400: Body size does not match Content-Range
+    """
+    upload_dir = await _get_upload_dir(upload_id)
+    part_path = upload_dir / f"part_{part_number}.bin"
+    # Unique per request, so a retry overlapping a slow attempt writes its own file
+    tmp_path = upload_dir / f"part_{part_number}.{uuid.uuid4().hex}.tmp"
+
+    size = 0
+    try:
+        async with aiofiles.open(tmp_path, "wb") as out:
+            async for chunk in request.stream():
+                size += len(chunk)
+                await out.write(chunk)
+    except BaseException:
+        # Client disconnected or the write failed
+        await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+        raise
+
+    content_range = request.headers.get("content-range")
+    if content_range:
+        match = _CONTENT_RANGE.fullmatch(content_range.strip())
+        expected = int(match.group(2)) - int(match.group(1)) + 1 if match else None
+        if expected != size:
+            await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Part {part_number} size {size} does not match Content-Range '{content_range}'",
+            )
+
+    # Only complete parts become visible, so a retry can overwrite safely
+    await aiofiles.os.replace(tmp_path, part_path)
+    return UploadStatusResponse(upload_id=upload_id, parts=await _list_parts(upload_dir))
+
+
+@router.get("/{upload_id}", response_model=UploadStatusResponse)
+async def get_upload(upload_id: str = PathParam(..., pattern=UPLOAD_ID_PATTERN)):
+    """
+    List the parts received so far, so a client can resume an upload
+
+    Raises:
+        404: Unknown upload
+    """
+    upload_dir = await _get_upload_dir(upload_id)
+    return UploadStatusResponse(upload_id=upload_id, parts=await _list_parts(upload_dir))
+
+
+@router.post("/{upload_id}/complete", response_model=ExtractResponse, status_code=status.HTTP_201_CREATED)
+async def complete_upload(
+    upload_id: str = PathParam(..., pattern=UPLOAD_ID_PATTERN),
+    voice_manager: VoiceLibraryManager = Depends(get_voice_manager),
+    extractor: VoiceExtractor = Depends(get_extractor),
+):
+    """
+    Assemble the parts and extract the voice
+
+    Raises:
+        404: Unknown upload
+        400: Parts missing (numbers must run from 0 without gaps)
+        500: Extraction failed
+    """
+    upload_dir = await _get_upload_dir(upload_id)
+    parts = await _list_parts(upload_dir)
+    if not parts or parts != list(range(len(parts))):
+        missing = sorted(set(range(max(parts, default=0) + 1)) - set(parts)) or [0]
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Upload is missing parts {missing}",
+        )
+
+    try:
+        async with aiofiles.open(upload_dir / "meta.json") as f:
+            meta = UploadInitRequest.model_validate_json(await f.read())
+
+        tmp_path = await _new_temp_path(Path(meta.filename).suffix)
+        try:
+            await asyncio.to_thread(_concat_parts, upload_dir, len(parts), tmp_path)
+        except BaseException:
+            await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+            raise
+
+        # Removes tmp_path whatever the outcome; the parts stay for a retry
+        response = await _create_voice_from_upload(
+            tmp_path,
+            filename=meta.filename,
+            voice_name=meta.voice_name,
+            start_time=meta.start_time,
+            end_time=meta.end_time,
+            description=meta.description,
+            voice_manager=voice_manager,
+            extractor=extractor,
+        )
+        await asyncio.to_thread(shutil.rmtree, upload_dir, True)
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Audio extraction failed: {str(e)}",
+        )
+
+
+async def _get_upload_dir(upload_id: str) -> Path:
+    """Directory of an in-progress upload (404 if unknown)"""
+    upload_dir = UPLOAD_DIR / upload_id
+    if not await aiofiles.os.path.isdir(upload_dir):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Upload '{upload_id}' not found",
+        )
+    return upload_dir
+
+
+async def _list_parts(upload_dir: Path) -> List[int]:
+    """Sorted numbers of the complete parts in an upload directory"""
+    parts = []
+    for entry in await aiofiles.os.scandir(upload_dir):
+        match = _PART_FILE.fullmatch(entry.name)
+        if match:
+            parts.append(int(match.group(1)))
+    return sorted(parts)
+
+
+def _expire_uploads() -> None:
+    """Delete uploads whose directory has not changed for UPLOAD_EXPIRY seconds"""
+    cutoff = time.time() - UPLOAD_EXPIRY
+    try:
+        entries = list(os.scandir(UPLOAD_DIR))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        try:
+            # Writing a part updates the directory's mtime
+            expired = entry.is_dir() and entry.stat().st_mtime < cutoff
+        except FileNotFoundError:
+            continue
+        if expired:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def _concat_parts(upload_dir: Path, count: int, output_path: Path) -> None:
+    """Concatenate part_0..part_{count-1} into output_path"""
+    with open(output_path, "wb") as out:
+        for n in range(count):
+            with open(upload_dir / f"part_{n}.bin", "rb") as part:
+                shutil.copyfileobj(part, out, 1 << 20)
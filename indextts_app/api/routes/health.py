@@ -1,24 +1,52 @@
 """Health check endpoints"""
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Request, Response, status
 from typing import Dict, Any
+import hashlib
 
-router = APIRouter(prefix="/health", tags=["Health"])
+import msgpack
+import orjson
 
+from ..serialization import MSGPACK_MEDIA_TYPE, MsgpackRoute
 
-@router.get("", status_code=status.HTTP_200_OK)
-async def health_check() -> Dict[str, Any]:
+router = APIRouter(prefix="/health", tags=["Health"], route_class=MsgpackRoute)
+
+# The health payload never changes while the process runs, so it is encoded
+# once per format and probes can revalidate it with If-None-Match
+HEALTH_STATUS: Dict[str, Any] = {
+    "status": "healthy",
+    "service": "IndexTTS API",
+    "version": "0.2.0",
+    "port": 5150,
+}
+HEALTH_BODY = orjson.dumps(HEALTH_STATUS)
+HEALTH_ETAG = f'"{hashlib.md5(HEALTH_BODY).hexdigest()}"'
+HEALTH_MSGPACK_BODY = msgpack.packb(HEALTH_STATUS, use_bin_type=True)
+HEALTH_MSGPACK_ETAG = f'"{hashlib.md5(HEALTH_MSGPACK_BODY).hexdigest()}"'
+
+
+@router.api_route("", methods=["GET", "HEAD"], status_code=status.HTTP_200_OK)
+async def health_check(request: Request) -> Response:
     """
     Health check endpoint
     
-    Returns service status and readiness information.
+    Returns service status and readiness information, as JSON or (with
+    ``Accept: application/msgpack``) MessagePack, each with its own ETag.
+    HEAD returns only the headers, and a matching If-None-Match gets
+    304 Not Modified.
     """
-    return {
-        "status": "healthy",
-        "service": "IndexTTS API",
-        "version": "0.2.0",
-        "port": 5150,
-    }
+    if MSGPACK_MEDIA_TYPE in request.headers.get("accept", ""):
+        body, etag, media_type = HEALTH_MSGPACK_BODY, HEALTH_MSGPACK_ETAG, MSGPACK_MEDIA_TYPE
+    else:
+        body, etag, media_type = HEALTH_BODY, HEALTH_ETAG, "application/json"
+    
+    headers = {"ETag": etag, "Vary": "Accept"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if request.method == "HEAD":
+        headers["Content-Length"] = str(len(body))
+        return Response(media_type=media_type, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
 
 
 @router.get("/ready", status_code=status.HTTP_200_OK)
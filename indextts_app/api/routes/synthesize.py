@@ -1,23 +1,55 @@
 """Speech synthesis endpoints"""
 
-from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import FileResponse
-from typing import Dict
-
-from ..utils import TTSSynthesizer
-from ..emotion import parse_emotion_tags
-from ..voice_library import VoiceLibraryManager
-from .models import SynthesisRequest, SynthesisResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import AsyncIterator, Dict, List
+import asyncio
+import functools
+import zlib
+
+import aiofiles
+import aiofiles.os
+import numpy as np
+
+from ...utils import (
+    TTSSynthesizer,
+    SynthesisRequest as SynthesisJob,
+    speaker_conditioning_path,
+    wav_stream_header,
+    wav_duration,
+)
+from ...emotion import parse_emotion_tags_to_matrix, parse_emotion_tags_to_vectors
+from ...voice_library import VoiceExtractor, VoiceLibraryManager, VoiceProfile
+from ..deps import get_synthesis_cache, get_synthesizer, get_voice_manager
+from ..models import SynthesisRequest, SynthesisResponse
+from ..batching import synthesis_pool
+from ..cache import SynthesisCache, synthesis_cache_key
 from pathlib import Path
+from ..serialization import MsgpackRoute
+
+router = APIRouter(prefix="/synthesize", tags=["Synthesis"], route_class=MsgpackRoute)
+
+# Maximum number of requests accepted by /synthesize/batch
+MAX_BATCH_SIZE = 64
+
+# Size of each read when sending audio files
+AUDIO_CHUNK_SIZE = 1 << 20
 
-router = APIRouter(prefix="/synthesize", tags=["Synthesis"])
+# Content types of the supported output formats
+AUDIO_MEDIA_TYPES = {"wav": "audio/wav", "mp3": "audio/mpeg", "ogg": "audio/ogg", "m4a": "audio/mp4"}
 
-synthesizer = TTSSynthesizer()
-voice_manager = VoiceLibraryManager()
+# gzip level for inline WAV audio; PCM gains little from higher levels
+GZIP_LEVEL = 1
 
 
 @router.post("", response_model=SynthesisResponse)
-async def synthesize_speech(request: SynthesisRequest):
+async def synthesize_speech(
+    request: SynthesisRequest,
+    http_request: Request,
+    synthesizer: TTSSynthesizer = Depends(get_synthesizer),
+    voice_manager: VoiceLibraryManager = Depends(get_voice_manager),
+    synthesis_cache: SynthesisCache = Depends(get_synthesis_cache),
+):
     """
     Synthesize speech with emotion-tagged text
     
@@ -33,45 +65,234 @@ async def synthesize_speech(request: SynthesisRequest):
         request: Synthesis request with voice_id, text, and optional parameters
     
     Returns:
-        Generated audio file and metadata
+        Generated audio file and metadata, or with ``inline`` the audio
+        itself (duration in the X-Audio-Duration header), which saves the
+        client a second request to download it; WAV audio is gzipped for
+        clients that send ``Accept-Encoding: gzip``
     
     Raises:
         404: Voice not found
-        400: Invalid emotion tags or parameters
+        400: Invalid emotion tags or parameters, or the voice has no reference audio
         500: Synthesis failed
     """
+    result = await _synthesize_one(request, synthesizer, voice_manager, synthesis_cache)
+    if not request.inline:
+        return result
+    media_type = AUDIO_MEDIA_TYPES.get(result.format, "application/octet-stream")
+    headers = {"X-Audio-Duration": f"{result.duration:.3f}"}
+    if result.format == "wav" and _accepts_gzip(http_request):
+        return StreamingResponse(
+            _gzip_chunks(_read_chunks([Path(result.audio_file)])),
+            media_type=media_type,
+            headers={**headers, "Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+    response = FileResponse(path=result.audio_file, media_type=media_type, headers=headers)
+    response.chunk_size = AUDIO_CHUNK_SIZE
+    return response
+
+
+@router.post("/batch", response_model=List[SynthesisResponse])
+async def synthesize_batch(
+    requests: List[SynthesisRequest],
+    http_request: Request,
+    synthesizer: TTSSynthesizer = Depends(get_synthesizer),
+    voice_manager: VoiceLibraryManager = Depends(get_voice_manager),
+    synthesis_cache: SynthesisCache = Depends(get_synthesis_cache),
+):
+    """
+    Synthesize several requests in one call
+    
+    All items enter the synthesis pool together, so items sharing a voice
+    run back to back on the cached speaker conditioning, and the caller pays
+    one HTTP round trip instead of one per message. Responses are returned
+    in request order.
+    
+    When every item sets ``inline``, the body is the audio files back to back
+    (application/octet-stream); the X-Audio-Lengths header lists their byte
+    sizes (and X-Audio-Durations their durations) in request order, so the
+    client splits the body without a download per item. With
+    ``Accept-Encoding: gzip`` and only WAV items the body is gzipped; the
+    lengths still refer to the decoded audio.
+    
+    Raises:
+        400: Too many items, or invalid emotion tags in an item
+        404: A voice was not found
+        500: Synthesis failed
+    """
+    if len(requests) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch too large ({len(requests)} > {MAX_BATCH_SIZE})",
+        )
+    results = await asyncio.gather(*(_synthesize_one(r, synthesizer, voice_manager, synthesis_cache) for r in requests))
+    if not requests or not all(r.inline for r in requests):
+        return results
+    
+    paths = [Path(r.audio_file) for r in results]
+    sizes = [(await aiofiles.os.stat(path)).st_size for path in paths]
+    headers = {
+        "X-Audio-Lengths": ",".join(map(str, sizes)),
+        "X-Audio-Durations": ",".join(f"{r.duration:.3f}" for r in results),
+    }
+    
+    if all(r.format == "wav" for r in results) and _accepts_gzip(http_request):
+        body = _gzip_chunks(_read_chunks(paths))
+        headers.update({"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+    else:
+        body = _read_chunks(paths)
+        headers["Content-Length"] = str(sum(sizes))
+    
+    return StreamingResponse(body, media_type="application/octet-stream", headers=headers)
+
+
+def _accepts_gzip(http_request: Request) -> bool:
+    """Whether Accept-Encoding allows gzip (listed, or via ``*``, with q > 0)"""
+    qualities: Dict[str, float] = {}
+    for item in http_request.headers.get("accept-encoding", "").split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+async def _read_chunks(paths: List[Path]) -> AsyncIterator[bytes]:
+    """Contents of the files, one after the other, in AUDIO_CHUNK_SIZE reads"""
+    for path in paths:
+        async with aiofiles.open(path, "rb") as f:
+            while chunk := await f.read(AUDIO_CHUNK_SIZE):
+                yield chunk
+
+
+async def _gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """gzip a byte stream, compressing each chunk off the event loop"""
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        data = await asyncio.to_thread(compressor.compress, chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _audio_duration(path: Path, output_format: str) -> float:
+    """Duration of a synthesized file in seconds (0.0 if it cannot be probed)"""
+    if output_format == "wav":
+        return wav_duration(path)
+    info = VoiceExtractor.get_audio_info(path)
+    return info["duration"] if info else 0.0
+
+
+async def _get_usable_voice(voice_manager: VoiceLibraryManager, voice_id: str) -> VoiceProfile:
+    """Voice to synthesize with (404 if unknown, 400 if it has no reference audio)"""
+    voice = await asyncio.to_thread(voice_manager.get_voice, voice_id)
+    if not voice:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Voice '{voice_id}' not found",
+        )
+    if not voice.audio_path:
+        # Profiles created without audio (POST /voices) cannot be cloned from
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Voice '{voice_id}' has no reference audio",
+        )
+    return voice
+
+
+async def _submit_for_voice(voice_manager: VoiceLibraryManager, voice: VoiceProfile, job):
+    """
+    Run a synthesis job for a voice in the shared request pool
+    
+    The first synthesis with a voice saves its speaker conditioning next to
+    the reference audio; the library version is then bumped, so GET /voices
+    (and its ETag) reports ``embedding_cached`` for the voice.
+    """
+    conditioning = speaker_conditioning_path(voice.audio_path)
+    had_conditioning = await aiofiles.os.path.exists(conditioning)
+    try:
+        return await synthesis_pool.submit(voice.id, job)
+    finally:
+        if not had_conditioning and await aiofiles.os.path.exists(conditioning):
+            voice_manager.mark_changed()
+
+
+def _tagged_text(request: SynthesisRequest) -> str:
+    """Request text with the ``emotion`` field applied as a leading tag"""
+    if request.emotion:
+        return f"[{request.emotion}]{request.text}"
+    return request.text
+
+
+async def _synthesize_one(
+    request: SynthesisRequest,
+    synthesizer: TTSSynthesizer,
+    voice_manager: VoiceLibraryManager,
+    synthesis_cache: SynthesisCache,
+) -> SynthesisResponse:
+    """Synthesize a single request (through the audio cache and request pool)"""
     try:
-        # Verify voice exists
-        voice = voice_manager.get_voice(request.voice_id)
-        if not voice:
+        voice = await _get_usable_voice(voice_manager, request.voice_id)
+        
+        if request.output_format not in AUDIO_MEDIA_TYPES:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Voice '{request.voice_id}' not found",
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported output format '{request.output_format}' "
+                       f"(supported: {', '.join(AUDIO_MEDIA_TYPES)})",
             )
         
-        # Parse emotion tags
-        emotion_vector, text_clean = parse_emotion_tags(request.text)
+        # Parse emotion tags into segment texts and one (N, 8) emotion matrix
+        texts, emotion_matrix = parse_emotion_tags_to_matrix(_tagged_text(request))
+        if not texts:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Text is empty",
+            )
         
-        # Synthesize
-        result = synthesizer.synthesize(
-            voice_id=request.voice_id,
-            text=text_clean,
-            emotion_vector=emotion_vector,
-            speed=request.speed,
+        async def produce():
+            # Synthesize each segment with its emotions (queued in the shared request pool)
+            result = await _submit_for_voice(
+                voice_manager,
+                voice,
+                functools.partial(
+                    synthesizer.synthesize_segments,
+                    texts,
+                    emotion_matrix,
+                    Path(voice.audio_path),
+                    output_format=request.output_format,
+                ),
+            )
+            if not result.success:
+                raise RuntimeError(result.error)
+            return result.audio_path
+        
+        # Identical requests are served from the audio cache; NUL keeps the
+        # segment boundaries in the key
+        cache_key = synthesis_cache_key(
+            request.voice_id,
+            "\0".join(texts),
+            emotion_matrix.ravel(),
+            request.output_format,
+        )
+        audio_path = await synthesis_cache.get_or_synth(
+            cache_key, produce, suffix=f".{request.output_format}"
         )
         
-        # Convert emotion vector back to readable format
-        emotions_applied = {}
-        emotion_names = ["happy", "angry", "sad", "afraid", "disgusted", "melancholic", "surprised", "calm"]
-        for i, name in enumerate(emotion_names):
-            if i < len(result.emotion_vector) and result.emotion_vector[i] > 0:
-                emotions_applied[name] = int(result.emotion_vector[i] * 100)
+        # Intensities 0-100 in EMOTION_ORDER, the strongest of each across segments
+        intensities = np.rint(emotion_matrix.max(axis=0) * 100).astype(np.uint8)
         
         return SynthesisResponse(
-            audio_file=str(result.audio_path),
-            duration=result.duration,
+            audio_file=str(audio_path),
+            duration=await asyncio.to_thread(_audio_duration, audio_path, request.output_format),
             format=request.output_format,
-            emotions_applied=emotions_applied,
+            emotion_vector=intensities.tolist(),
             message="Synthesis completed successfully",
         )
     
@@ -89,6 +310,66 @@ async def synthesize_speech(request: SynthesisRequest):
         )
 
 
+@router.post("/stream")
+async def stream_synthesize(
+    request: SynthesisRequest,
+    synthesizer: TTSSynthesizer = Depends(get_synthesizer),
+    voice_manager: VoiceLibraryManager = Depends(get_voice_manager),
+) -> StreamingResponse:
+    """
+    Synthesize speech and stream WAV audio as it is generated
+    
+    The text is split at emotion-tag boundaries and each part is synthesized
+    with its own emotion vector; IndexTTS2 further splits long parts at sentence
+    boundaries. A WAV header with unknown length is sent first, followed by raw
+    16-bit PCM frames as the vocoder produces them, so playback can start after
+    the first segment instead of after the whole utterance.
+    
+    Raises:
+        404: Voice not found
+        400: Invalid emotion tags, or the voice has no reference audio
+    """
+    voice = await _get_usable_voice(voice_manager, request.voice_id)
+    
+    try:
+        segments, plain_text = parse_emotion_tags_to_vectors(_tagged_text(request))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid emotion tags: {str(e)}",
+        )
+    if not segments:
+        segments = [(plain_text, None)]
+    
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    def produce():
+        # Runs on the pool's worker thread; hands chunks back to the event loop
+        try:
+            for text_segment, emotion_vector in segments:
+                job = SynthesisJob(
+                    text=text_segment,
+                    voice_id=request.voice_id,
+                    emotion_vector=emotion_vector,
+                )
+                for pcm in synthesizer.stream(job, Path(voice.audio_path)):
+                    loop.call_soon_threadsafe(queue.put_nowait, pcm)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+    
+    pending = asyncio.ensure_future(_submit_for_voice(voice_manager, voice, produce))
+    
+    async def audio_chunks():
+        yield wav_stream_header(synthesizer.output_sample_rate)
+        while (pcm := await queue.get()) is not None:
+            yield pcm
+        # Surface synthesis errors (aborts the response)
+        await pending
+    
+    return StreamingResponse(audio_chunks(), media_type="audio/wav")
+
+
 @router.get("/audio/{audio_id}")
 async def get_audio(audio_id: str):
     """
@@ -104,17 +385,25 @@ async def get_audio(audio_id: str):
         # Construct path (simplified - in production, use proper path resolution)
         audio_path = Path(f"./audio/{audio_id}")
         
-        if not audio_path.exists():
+        # One stat serves both the existence check and the response headers
+        try:
+            stat_result = await aiofiles.os.stat(audio_path)
+        except FileNotFoundError:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Audio file '{audio_id}' not found",
             )
         
-        return FileResponse(
+        # FileResponse already streams the file with async chunked reads and
+        # keeps the ETag/Last-Modified headers; only the chunk size is raised
+        response = FileResponse(
             path=audio_path,
             media_type="audio/wav",
             filename=audio_path.name,
+            stat_result=stat_result,
         )
+        response.chunk_size = AUDIO_CHUNK_SIZE
+        return response
     except HTTPException:
         raise
     except Exception as e:
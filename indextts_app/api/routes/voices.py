@@ -1,42 +1,54 @@
 """Voice management endpoints"""
 
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from typing import List, Optional
 from datetime import datetime
+import asyncio
+import hashlib
 
-from ..voice_library import VoiceLibraryManager
-from .models import VoiceProfileResponse, VoiceListResponse, VoiceCreateRequest
+import orjson
 
-router = APIRouter(prefix="/voices", tags=["Voices"])
+from ...voice_library import VoiceLibraryManager, VoiceProfile
+from ...utils import speaker_conditioning_path
+from ..deps import get_voice_manager
+from ..models import VoiceProfileResponse, VoiceListResponse, VoiceCreateRequest
+from ..serialization import MsgpackRoute
 
-# Initialize voice library manager (singleton-like)
-voice_manager = VoiceLibraryManager()
+router = APIRouter(prefix="/voices", tags=["Voices"], route_class=MsgpackRoute)
+
+# Encoded GET /voices body, its ETag, and the library version it was built from
+_cached_list: Optional[bytes] = None
+_cached_etag = ""
+_cache_version = -1
 
 
 @router.get("", response_model=VoiceListResponse)
-async def list_voices():
+async def list_voices(
+    request: Request,
+    voice_manager: VoiceLibraryManager = Depends(get_voice_manager),
+):
     """
     List all voices in the library
     
-    Returns a list of all available voice profiles with metadata.
+    Returns a list of all available voice profiles with metadata. The
+    response is built and encoded only after the library changes; other
+    requests reuse the encoded body, and pollers sending a matching
+    If-None-Match get 304 Not Modified.
     """
+    global _cached_list, _cached_etag, _cache_version
     try:
-        voices = voice_manager.list_voices()
-        return VoiceListResponse(
-            voices=[
-                VoiceProfileResponse(
-                    voice_id=v.voice_id,
-                    name=v.name,
-                    description=v.description,
-                    gender=v.gender,
-                    source_media=v.source_media,
-                    created_at=v.created_at,
-                    metadata=v.metadata,
-                )
-                for v in voices
-            ],
-            count=len(voices),
-        )
+        version = voice_manager.version
+        if _cached_list is None or _cache_version != version:
+            # Library reads hit SQLite and the filesystem, keep them off the loop
+            voice_list = await asyncio.to_thread(_build_voice_list, voice_manager)
+            _cached_list = orjson.dumps(voice_list.model_dump(mode="json"))
+            # Hash of the body rather than the version, which restarts at 0
+            _cached_etag = f'"{hashlib.md5(_cached_list).hexdigest()}"'
+            _cache_version = version
+        headers = {"ETag": _cached_etag}
+        if request.headers.get("if-none-match") == _cached_etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(_cached_list, media_type="application/json", headers=headers)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -44,8 +56,35 @@ async def list_voices():
         )
 
 
+def _build_voice_list(voice_manager: VoiceLibraryManager) -> VoiceListResponse:
+    """Build the GET /voices response from the library"""
+    voices = voice_manager.list_voices()
+    return VoiceListResponse.model_construct(
+        voices=[_voice_response(v) for v in voices],
+        count=len(voices),
+    )
+
+
+def _voice_response(voice: VoiceProfile) -> VoiceProfileResponse:
+    """Build the API view of a voice profile (checks the embedding cache on disk)"""
+    # Profiles come from our own library, so skip pydantic validation
+    return VoiceProfileResponse.model_construct(
+        voice_id=voice.id,
+        name=voice.name,
+        description=voice.description,
+        gender=voice.metadata.get("gender"),
+        source_media=voice.source_file or None,
+        created_at=datetime.fromisoformat(voice.created_at),
+        metadata=voice.metadata,
+        embedding_cached=bool(voice.audio_path) and speaker_conditioning_path(voice.audio_path).exists(),
+    )
+
+
 @router.get("/{voice_id}", response_model=VoiceProfileResponse)
-async def get_voice(voice_id: str):
+async def get_voice(
+    voice_id: str,
+    voice_manager: VoiceLibraryManager = Depends(get_voice_manager),
+):
     """
     Get details of a specific voice
     
@@ -56,21 +95,13 @@ async def get_voice(voice_id: str):
         Voice profile with all metadata
     """
     try:
-        voice = voice_manager.get_voice(voice_id)
+        voice = await asyncio.to_thread(voice_manager.get_voice, voice_id)
         if not voice:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Voice '{voice_id}' not found",
             )
-        return VoiceProfileResponse(
-            voice_id=voice.voice_id,
-            name=voice.name,
-            description=voice.description,
-            gender=voice.gender,
-            source_media=voice.source_media,
-            created_at=voice.created_at,
-            metadata=voice.metadata,
-        )
+        return await asyncio.to_thread(_voice_response, voice)
     except HTTPException:
         raise
     except Exception as e:
@@ -81,12 +112,16 @@ async def get_voice(voice_id: str):
 
 
 @router.post("", response_model=VoiceProfileResponse, status_code=status.HTTP_201_CREATED)
-async def create_voice(request: VoiceCreateRequest):
+async def create_voice(
+    request: VoiceCreateRequest,
+    voice_manager: VoiceLibraryManager = Depends(get_voice_manager),
+):
     """
     Create a new voice profile
     
     Useful for manually adding voices to the library without extraction.
-    For cloning from media, use POST /api/extract instead.
+    The profile has no reference audio, so synthesis with it is rejected
+    (400); for cloning from media, use POST /api/extract instead.
     
     Args:
         request: Voice creation request with name and optional metadata
@@ -95,21 +130,21 @@ async def create_voice(request: VoiceCreateRequest):
         Created voice profile
     """
     try:
-        voice = voice_manager.add_voice(
+        voice = await asyncio.to_thread(
+            voice_manager.add_voice,
             name=request.name,
             description=request.description,
             gender=request.gender,
             metadata=request.metadata,
         )
-        return VoiceProfileResponse(
-            voice_id=voice.voice_id,
-            name=voice.name,
-            description=voice.description,
-            gender=voice.gender,
-            source_media=voice.source_media,
-            created_at=voice.created_at,
-            metadata=voice.metadata,
-        )
+        if voice is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Voice '{request.name}' already exists",
+            )
+        return await asyncio.to_thread(_voice_response, voice)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -118,15 +153,21 @@ async def create_voice(request: VoiceCreateRequest):
 
 
 @router.delete("/{voice_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_voice(voice_id: str):
+async def delete_voice(
+    voice_id: str,
+    voice_manager: VoiceLibraryManager = Depends(get_voice_manager),
+):
     """
     Delete a voice from the library
     
+    The voice's stored reference audio and precomputed conditioning are
+    removed with it.
+    
     Args:
         voice_id: The unique identifier of the voice to delete
     """
     try:
-        success = voice_manager.remove_voice(voice_id)
+        success = await asyncio.to_thread(voice_manager.delete_voice, voice_id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
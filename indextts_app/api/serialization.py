@@ -0,0 +1,83 @@
+"""Wire encodings for the API
+
+JSON responses are rendered with orjson (ORJSONResponse is the app default).
+Clients may also speak MessagePack: a body sent with
+``Content-Type: application/msgpack`` is decoded before validation, and
+``Accept: application/msgpack`` re-encodes JSON responses as MessagePack.
+Those responses carry ``Vary: Accept`` so caches keep the two encodings apart.
+"""
+
+from typing import Any, Callable
+
+import msgpack
+import orjson
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+
+class MsgpackRequest(Request):
+    """Request whose body is MessagePack but is parsed like a JSON body"""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = msgpack.unpackb(await self.body(), raw=False)
+        return self._json
+
+
+class MsgpackResponse(Response):
+    """Response rendered as MessagePack"""
+
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, use_bin_type=True)
+
+
+def _as_json_scope(scope: dict) -> dict:
+    """Copy of scope with the content type set to JSON"""
+    # FastAPI only calls Request.json() for bodies it considers JSON
+    headers = [(k, v) for k, v in scope["headers"] if k != b"content-type"]
+    headers.append((b"content-type", b"application/json"))
+    return {**scope, "headers": headers}
+
+
+class MsgpackRoute(APIRoute):
+    """Route that accepts and returns MessagePack on request"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if request.headers.get("content-type", "").startswith(MSGPACK_MEDIA_TYPE):
+                request = MsgpackRequest(_as_json_scope(request.scope), request.receive)
+
+            response = await handler(request)
+            if response.media_type != "application/json":
+                return response
+
+            # HEAD responses, 304s and other empty bodies have nothing to re-encode
+            body = getattr(response, "body", b"")
+            if (
+                MSGPACK_MEDIA_TYPE in request.headers.get("accept", "")
+                and request.method != "HEAD"
+                and body
+            ):
+                # The JSON ETag does not describe the MessagePack body
+                headers = {
+                    k: v for k, v in response.headers.items()
+                    if k not in ("content-length", "content-type", "etag")
+                }
+                response = MsgpackResponse(
+                    orjson.loads(body),
+                    status_code=response.status_code,
+                    headers=headers,
+                    background=response.background,
+                )
+            vary = {v.strip().lower() for v in response.headers.get("vary", "").split(",")}
+            if "accept" not in vary:
+                response.headers.add_vary_header("Accept")
+            return response
+
+        return route_handler
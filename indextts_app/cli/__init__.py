@@ -109,6 +109,73 @@ def extract_audio(input_file, output_file, sample_rate, start, duration):
         click.echo(f"✗ Failed to extract audio")
 
 
+@extract.command('batch')
+@click.argument('patterns', nargs=-1, required=True)
+@click.option('--output-dir', '-o', type=click.Path(), default='.', help='Directory for extracted WAV files')
+@click.option('--sample-rate', '-r', type=int, default=24000, help='Sample rate in Hz')
+@click.option('--workers', '-w', type=int, default=None, help='Parallel ffmpeg processes (default: CPU count)')
+def extract_batch(patterns, output_dir, sample_rate, workers):
+    """Extract audio from many media files in parallel (accepts globs)
+
+    Outputs mirror the inputs' directory layout under --output-dir, so
+    same-named files from different directories do not overwrite each other.
+    """
+    import glob
+    import os
+    from collections import Counter
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from indextts_app.voice_library import VoiceExtractor
+    
+    files = sorted({
+        Path(match)
+        for pattern in patterns
+        for match in glob.glob(pattern, recursive=True)
+        if Path(match).is_file()
+    })
+    if not files:
+        click.echo("No matching files")
+        return
+    
+    out_dir = Path(output_dir)
+    
+    # Paths relative to the deepest directory holding every input
+    base = Path(os.path.commonpath([path.resolve().parent for path in files]))
+    outputs = {
+        path: out_dir / path.resolve().relative_to(base).with_suffix('.wav')
+        for path in files
+    }
+    # Same stem in one directory (clip.mp4, clip.mp3): keep the extension in the name
+    taken = Counter(outputs.values())
+    for path, output in outputs.items():
+        if taken[output] > 1:
+            outputs[path] = output.with_name(f"{path.stem}_{path.suffix.lstrip('.')}.wav")
+    for parent in {output.parent for output in outputs.values()}:
+        parent.mkdir(parents=True, exist_ok=True)
+    
+    # Each job spends its time in an ffmpeg child process, so threads are
+    # enough to keep one ffmpeg running per core
+    failed = 0
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {
+            pool.submit(
+                VoiceExtractor.extract_audio,
+                path,
+                outputs[path],
+                sample_rate=sample_rate,
+            ): path
+            for path in files
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            if future.result():
+                click.echo(f"✓ {path} -> {outputs[path]}")
+            else:
+                failed += 1
+                click.echo(f"✗ Failed to extract audio from {path}")
+    
+    click.echo(f"Extracted {len(files) - failed}/{len(files)} files")
+
+
 @cli.group()
 def test():
     """Test TTS synthesis"""
@@ -201,6 +268,7 @@ Commands:
   voice remove    Remove voice from library
   
   extract audio   Extract audio from media files
+  extract batch   Extract audio from many files in parallel
   
   test speak      Test TTS synthesis
 
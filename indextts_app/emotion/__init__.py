@@ -3,15 +3,19 @@
 from .parser import (
     parse_emotion_tags,
     parse_emotion_tags_to_vectors,
+    parse_emotion_tags_to_matrix,
     EmotionSegment,
-    EmotionTagParser
+    EmotionTagParser,
+    EMOTION_ORDER,
 )
 from .utils import text_to_emotion_vector
 
 __all__ = [
     "parse_emotion_tags",
     "parse_emotion_tags_to_vectors",
+    "parse_emotion_tags_to_matrix",
     "EmotionSegment",
     "EmotionTagParser",
+    "EMOTION_ORDER",
     "text_to_emotion_vector"
 ]
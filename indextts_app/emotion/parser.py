@@ -12,9 +12,13 @@ Supports:
 - Overlapping emotion segments
 """
 
+import functools
 import re
+import sys
 from dataclasses import dataclass
-from typing import List, Tuple, Optional, Dict
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
 
 
 # Map emotion names to indices in emotion vector
@@ -36,31 +40,98 @@ EMOTION_MAP = {
     "peaceful": 7,
 }
 
+# Canonical emotion names, in emotion vector order
+EMOTION_ORDER: Tuple[str, ...] = (
+    "happy", "angry", "sad", "afraid", "disgusted", "melancholic", "surprised", "calm",
+)
+
+# Number of emotions in an IndexTTS2 emotion vector
+NUM_EMOTIONS = len(EMOTION_ORDER)
+
+# Element type of emotion vectors (matches the model's float32 weights)
+_EMO_DTYPE = np.float32
+
+# One "name:intensity" item of a tag body; items that do not match exactly
+# (e.g. "sad:abc") are skipped
+_PAIR_RE = re.compile(
+    r'(?:^|,)\s*([A-Za-z_]+)\s*:\s*'
+    r'([-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?)\s*(?=,|\Z)'
+)
+
+
+def _emotions_to_vector(emotions: Mapping[str, float]) -> np.ndarray:
+    """Fill an emotion vector by index from a lowercase name -> intensity (0-100) mapping"""
+    vector = np.zeros(NUM_EMOTIONS, dtype=_EMO_DTYPE)
+    indices = []
+    intensities = []
+    for emotion_name, intensity in emotions.items():
+        emotion_idx = EMOTION_MAP.get(emotion_name)
+        if emotion_idx is not None:
+            indices.append(emotion_idx)
+            intensities.append(intensity)
+    if indices:
+        # Normalize intensity to 0-1 range; aliases keep the strongest value
+        np.maximum.at(vector, indices, np.divide(intensities, 100.0))
+    return vector
+
 
-@dataclass
+def _emotions_to_row(emotions: Mapping[str, float]) -> List[float]:
+    """Same values as _emotions_to_vector, as a plain list (no array per tag)"""
+    row = [0.0] * NUM_EMOTIONS
+    for emotion_name, intensity in emotions.items():
+        emotion_idx = EMOTION_MAP.get(emotion_name)
+        if emotion_idx is not None:
+            value = intensity / 100.0
+            if value > row[emotion_idx]:
+                row[emotion_idx] = value
+    return row
+
+
+# Vector of untagged text (read-only, shared by every tag-free parse)
+_NEUTRAL_VECTOR = np.zeros(NUM_EMOTIONS, dtype=_EMO_DTYPE)
+_NEUTRAL_VECTOR.setflags(write=False)
+
+
+@dataclass(frozen=True, slots=True)
 class EmotionSegment:
-    """Represents a text segment with associated emotions"""
+    """Represents a text segment with associated emotions (read-only, parse results are shared)"""
     text: str
     start_char: int
     end_char: int
-    emotions: Dict[str, float]  # emotion_name -> intensity (0-100)
+    emotions: Mapping[str, float]  # emotion_name -> intensity (0-100), shared between segments
+    
+    def to_emotion_vector(self) -> np.ndarray:
+        """Convert emotions to IndexTTS2 emotion vector format (float32, length 8)"""
+        return _emotions_to_vector(self.emotions)
+
+
+def _iter_tags(text: str) -> Iterator[Tuple[int, int, str]]:
+    """
+    Yield (start, end, content) for each [content] tag in text
     
-    def to_emotion_vector(self) -> List[float]:
-        """Convert emotions to IndexTTS2 emotion vector format"""
-        vector = [0.0] * 8  # 8 emotions
-        for emotion_name, intensity in self.emotions.items():
-            emotion_idx = EMOTION_MAP.get(emotion_name.lower())
-            if emotion_idx is not None:
-                # Normalize intensity to 0-1 range
-                normalized = intensity / 100.0
-                vector[emotion_idx] = max(vector[emotion_idx], normalized)
-        return vector
+    Equivalent to ``EmotionTagParser.TAG_PATTERN.finditer`` but jumps between
+    brackets with str.find, so the scan runs in C and never backtracks on
+    malformed tags like ``[]`` or an unclosed ``[``.
+    """
+    find = text.find
+    start = find("[")
+    while start != -1:
+        end = find("]", start + 1)
+        if end == -1:
+            return
+        if end > start + 1:
+            yield start, end + 1, text[start + 1:end]
+            start = find("[", end + 1)
+        else:
+            # Empty "[]" is plain text
+            start = find("[", start + 1)
 
 
 class EmotionTagParser:
     """Parser for emotion-tagged text"""
     
-    # Pattern to match [emotion:intensity,emotion:intensity]
+    # Pattern to match [emotion:intensity,emotion:intensity] (the parser
+    # scans with _iter_tags, which finds exactly these matches)
     TAG_PATTERN = re.compile(r'\[([^\]]+)\]')
     
     @staticmethod
@@ -72,48 +143,49 @@ class EmotionTagParser:
             tag_content: The content inside [ ]
             
         Returns:
-            Dictionary mapping emotion names to intensities
+            Dictionary mapping lowercase emotion names to intensities
         """
-        emotions = {}
-        # Split by comma for multiple emotions
-        for emotion_spec in tag_content.split(','):
-            emotion_spec = emotion_spec.strip()
-            if ':' in emotion_spec:
-                emotion_name, intensity_str = emotion_spec.split(':', 1)
-                emotion_name = emotion_name.strip()
-                try:
-                    intensity = float(intensity_str.strip())
-                    # Clamp intensity to 0-100
-                    intensity = max(0.0, min(100.0, intensity))
-                    emotions[emotion_name.lower()] = intensity
-                except ValueError:
-                    # Skip malformed intensity values
-                    pass
-        return emotions
+        # Names are lowercased (and interned) only here; EMOTION_MAP lookups
+        # downstream use them as-is. Clamp intensities to 0-100
+        return {
+            sys.intern(m.group(1).lower()): max(0.0, min(100.0, float(m.group(2))))
+            for m in _PAIR_RE.finditer(tag_content)
+        }
     
     @classmethod
     def parse(cls, text: str) -> Tuple[List[EmotionSegment], str]:
         """
         Parse text with emotion tags
         
+        Results are memoized per text, so repeated prompts skip the scan; the
+        returned segments are shared between callers and must not be modified.
+        
         Args:
             text: Text with emotion tags like [Calm:60,Happy:40]Some text[angry:30]more text
             
         Returns:
             Tuple of (EmotionSegments, plain_text_without_tags)
         """
+        if "[" not in text:
+            # No tags possible: one neutral segment, no scan or cache entry
+            if not text.strip():
+                return [], text
+            return [EmotionSegment(text=text, start_char=0, end_char=len(text), emotions={})], text
+        segments, plain_text = _parse_cached(text)
+        return list(segments), plain_text
+    
+    @classmethod
+    def _parse(cls, text: str) -> Tuple[List[EmotionSegment], str]:
+        """Uncached implementation of parse()"""
         segments = []
-        plain_text = ""
+        parts = []
+        # Replaced (never mutated) on each tag, so segments can share it
         current_emotions = {}
         last_end = 0
         char_offset = 0  # Track character position in plain text
         
         # Find all tags and their positions
-        for match in cls.TAG_PATTERN.finditer(text):
-            tag_start = match.start()
-            tag_end = match.end()
-            tag_content = match.group(1)
-            
+        for tag_start, tag_end, tag_content in _iter_tags(text):
             # Add text before this tag
             text_before = text[last_end:tag_start]
             if text_before:
@@ -121,15 +193,16 @@ class EmotionTagParser:
                     text=text_before,
                     start_char=char_offset,
                     end_char=char_offset + len(text_before),
-                    emotions=current_emotions.copy()
+                    emotions=current_emotions
                 )
                 segments.append(segment)
-                plain_text += text_before
+                parts.append(text_before)
                 char_offset += len(text_before)
             
             # Update current emotions
             new_emotions = cls.parse_tag(tag_content)
-            current_emotions.update(new_emotions)
+            if new_emotions:
+                current_emotions = {**current_emotions, **new_emotions}
             
             last_end = tag_end
         
@@ -140,30 +213,103 @@ class EmotionTagParser:
                 text=remaining_text,
                 start_char=char_offset,
                 end_char=char_offset + len(remaining_text),
-                emotions=current_emotions.copy()
+                emotions=current_emotions
             )
             segments.append(segment)
-            plain_text += remaining_text
+            parts.append(remaining_text)
         
         # Filter out empty segments
         segments = [s for s in segments if s.text.strip()]
         
-        return segments, plain_text
+        return segments, "".join(parts)
     
     @classmethod
-    def parse_to_vectors(cls, text: str) -> Tuple[List[Tuple[str, List[float]]], str]:
+    def parse_to_vectors(cls, text: str) -> Tuple[List[Tuple[str, np.ndarray]], str]:
         """
         Parse text and convert emotions to vectors
         
+        Walks the text once with the tag scanner, keeping the active
+        emotions as a plain row, then builds every vector in a single (N, 8)
+        array; the vectors are rows of it. Results are memoized per text and
+        the vectors are read-only.
+        
         Args:
             text: Text with emotion tags
             
         Returns:
             Tuple of (list of (text_segment, emotion_vector), plain_text)
         """
-        segments, plain_text = cls.parse(text)
-        vectors = [(seg.text, seg.to_emotion_vector()) for seg in segments]
-        return vectors, plain_text
+        if "[" not in text:
+            return ([(text, _NEUTRAL_VECTOR)] if text.strip() else []), text
+        vectors, plain_text = _parse_vectors_cached(text)
+        return list(vectors), plain_text
+    
+    @classmethod
+    def _parse_to_vectors(cls, text: str) -> Tuple[List[Tuple[str, np.ndarray]], str]:
+        """Uncached implementation of parse_to_vectors()"""
+        texts = []
+        rows = []
+        plain_parts = []
+        current_emotions = {}
+        current_row = _emotions_to_row(current_emotions)
+        last_end = 0
+        
+        for tag_start, tag_end, tag_content in _iter_tags(text):
+            text_before = text[last_end:tag_start]
+            if text_before:
+                plain_parts.append(text_before)
+                if text_before.strip():
+                    texts.append(text_before)
+                    rows.append(current_row)
+            
+            current_emotions.update(cls.parse_tag(tag_content))
+            current_row = _emotions_to_row(current_emotions)
+            last_end = tag_end
+        
+        remaining_text = text[last_end:]
+        if remaining_text:
+            plain_parts.append(remaining_text)
+            if remaining_text.strip():
+                texts.append(remaining_text)
+                rows.append(current_row)
+        
+        # One contiguous (N, 8) array; each segment's vector is a row of it
+        matrix = np.array(rows, dtype=_EMO_DTYPE).reshape(-1, NUM_EMOTIONS)
+        return list(zip(texts, matrix)), "".join(plain_parts)
+    
+    @classmethod
+    def parse_to_matrix(cls, text: str) -> Tuple[List[str], np.ndarray]:
+        """
+        Parse text into segment texts and one stacked emotion matrix
+        
+        Args:
+            text: Text with emotion tags
+            
+        Returns:
+            Tuple of (segment texts, float32 array of shape (N, 8)) where row i
+            is the emotion vector of segment i
+        """
+        vectors, _ = cls.parse_to_vectors(text)
+        if not vectors:
+            return [], np.zeros((0, NUM_EMOTIONS), dtype=_EMO_DTYPE)
+        texts = [segment for segment, _ in vectors]
+        return texts, np.stack([vector for _, vector in vectors])
+
+
+@functools.lru_cache(maxsize=2048)
+def _parse_cached(text: str) -> Tuple[Tuple[EmotionSegment, ...], str]:
+    """Memoized EmotionTagParser._parse with an immutable result"""
+    segments, plain_text = EmotionTagParser._parse(text)
+    return tuple(segments), plain_text
+
+
+@functools.lru_cache(maxsize=2048)
+def _parse_vectors_cached(text: str) -> Tuple[Tuple[Tuple[str, np.ndarray], ...], str]:
+    """Memoized EmotionTagParser._parse_to_vectors with read-only vectors"""
+    vectors, plain_text = EmotionTagParser._parse_to_vectors(text)
+    for _, vector in vectors:
+        vector.flags.writeable = False
+    return tuple(vectors), plain_text
 
 
 def parse_emotion_tags(text: str) -> Tuple[List[EmotionSegment], str]:
@@ -179,7 +325,7 @@ def parse_emotion_tags(text: str) -> Tuple[List[EmotionSegment], str]:
     return EmotionTagParser.parse(text)
 
 
-def parse_emotion_tags_to_vectors(text: str) -> Tuple[List[Tuple[str, List[float]]], str]:
+def parse_emotion_tags_to_vectors(text: str) -> Tuple[List[Tuple[str, np.ndarray]], str]:
     """
     Parse emotion tags and return text segments with emotion vectors
     
@@ -190,3 +336,16 @@ def parse_emotion_tags_to_vectors(text: str) -> Tuple[List[Tuple[str, List[float
         Tuple of (list of (text_segment, emotion_vector), plain_text)
     """
     return EmotionTagParser.parse_to_vectors(text)
+
+
+def parse_emotion_tags_to_matrix(text: str) -> Tuple[List[str], np.ndarray]:
+    """
+    Parse emotion tags and return segment texts with an (N, 8) emotion matrix
+    
+    Args:
+        text: Text with emotion tags
+        
+    Returns:
+        Tuple of (segment texts, emotion matrix)
+    """
+    return EmotionTagParser.parse_to_matrix(text)
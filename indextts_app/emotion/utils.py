@@ -2,6 +2,8 @@
 
 from typing import List, Dict, Optional
 
+import numpy as np
+
 from .parser import EmotionTagParser, EMOTION_MAP
 
 
@@ -42,7 +44,7 @@ def text_to_emotion_vector(
         tag_content = emotion_description.replace(':', ':').replace('%', '')
         emotions = EmotionTagParser.parse_tag(tag_content)
         for emotion_name, intensity in emotions.items():
-            emotion_idx = EMOTION_MAP.get(emotion_name.lower())
+            emotion_idx = EMOTION_MAP.get(emotion_name)
             if emotion_idx is not None:
                 vector[emotion_idx] = min(1.0, intensity / 100.0)
     
@@ -56,6 +58,8 @@ def merge_emotion_vectors(
     """
     Merge multiple emotion vectors with optional weights
     
+    The weighted sum runs as one NumPy reduction over the stacked vectors.
+    
     Args:
         vectors: List of emotion vectors
         weights: Optional weights for each vector (will be normalized)
@@ -66,22 +70,16 @@ def merge_emotion_vectors(
     if not vectors:
         return [0.0] * 8
     
+    matrix = np.asarray(vectors, dtype=np.float64)
     if weights is None:
-        weights = [1.0] * len(vectors)
+        merged = matrix.sum(axis=0)
     else:
         # Normalize weights
-        total = sum(weights)
-        weights = [w / total for w in weights]
-    
-    merged = [0.0] * 8
-    for vector, weight in zip(vectors, weights):
-        for i, emotion_val in enumerate(vector):
-            merged[i] += emotion_val * weight
+        w = np.asarray(weights, dtype=np.float64)
+        merged = w @ matrix / w.sum()
     
     # Ensure values don't exceed 1.0
-    merged = [min(1.0, val) for val in merged]
-    
-    return merged
+    return np.minimum(merged, 1.0).tolist()
 
 
 def normalize_emotion_vector(vector: List[float]) -> List[float]:
@@ -94,7 +92,10 @@ def normalize_emotion_vector(vector: List[float]) -> List[float]:
     Returns:
         Normalized vector
     """
-    max_val = max(vector) if vector else 1.0
+    if len(vector) == 0:
+        return vector
+    values = np.asarray(vector, dtype=np.float64)
+    max_val = values.max()
     if max_val == 0.0:
         return vector
-    return [v / max_val for v in vector]
+    return (values / max_val).tolist()
@@ -0,0 +1,68 @@
+"""
+Export the BigVGAN vocoder to ONNX
+
+The exported graph is used by TTSSynthesizer(backend="onnx") to vocode on
+ONNX Runtime (CoreML/CPU execution providers) instead of PyTorch.
+
+Run with:
+    python -m indextts_app.export_onnx --config checkpoints/config.yaml --output checkpoints/bigvgan.onnx
+"""
+
+import argparse
+from pathlib import Path
+
+# Default file name of the exported vocoder inside the model directory
+VOCODER_ONNX_NAME = "bigvgan.onnx"
+
+
+def export_vocoder(config_path: Path, output_path: Path, opset_version: int = 17) -> Path:
+    """
+    Export the vocoder named in config.yaml to ONNX
+
+    Args:
+        config_path: Path to the IndexTTS2 config.yaml
+        output_path: Where to write the .onnx file
+        opset_version: ONNX opset to target
+
+    Returns:
+        Path to the exported model
+    """
+    import torch
+    from omegaconf import OmegaConf
+    from indextts.s2mel.modules.bigvgan import bigvgan
+
+    cfg = OmegaConf.load(str(config_path))
+    # The fused CUDA activation kernel cannot be traced, export the torch path
+    vocoder = bigvgan.BigVGAN.from_pretrained(cfg.vocoder.name, use_cuda_kernel=False)
+    vocoder.remove_weight_norm()
+    vocoder.eval()
+
+    dummy_mel = torch.randn(1, vocoder.h.num_mels, 100)
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            vocoder,
+            dummy_mel,
+            str(output_path),
+            input_names=["mel"],
+            output_names=["wav"],
+            opset_version=opset_version,
+            dynamic_axes={"mel": {0: "batch", 2: "T"}, "wav": {0: "batch", 2: "samples"}},
+        )
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the IndexTTS2 vocoder to ONNX")
+    parser.add_argument("--config", type=Path, default=Path("checkpoints/config.yaml"), help="Path to config.yaml")
+    parser.add_argument("--output", type=Path, default=Path("checkpoints") / VOCODER_ONNX_NAME, help="Output .onnx path")
+    parser.add_argument("--opset", type=int, default=17, help="ONNX opset version")
+    args = parser.parse_args()
+
+    path = export_vocoder(args.config, args.output, args.opset)
+    print(f"✓ Vocoder exported to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 """IndexTTS synthesis core module"""
 
-from .synthesizer import TTSSynthesizer, SynthesisRequest, SynthesisResult
+from .synthesizer import TTSSynthesizer, SynthesisRequest, SynthesisResult, speaker_conditioning_path
+from .audio import wav_stream_header, wav_duration, pcm16_bytes
 
-__all__ = ["TTSSynthesizer", "SynthesisRequest", "SynthesisResult"]
+__all__ = ["TTSSynthesizer", "SynthesisRequest", "SynthesisResult", "wav_stream_header", "wav_duration", "pcm16_bytes", "speaker_conditioning_path"]
@@ -0,0 +1,75 @@
+"""
+Audio helpers for synthesis output
+
+Builds WAV framing around raw PCM chunks produced by the vocoder
+"""
+
+import struct
+import wave
+
+import numpy as np
+
+# RIFF/data size used when the total stream length is not known up front
+UNKNOWN_WAV_SIZE = 0xFFFFFFFF
+
+
+def wav_stream_header(sample_rate: int, channels: int = 1, bits_per_sample: int = 16) -> bytes:
+    """
+    Build a 44-byte WAV header for a stream of unknown length
+
+    Players treat the maximal RIFF/data sizes as "read until EOF", which lets
+    PCM frames be sent as soon as they are produced.
+
+    Args:
+        sample_rate: Sample rate in Hz
+        channels: Number of audio channels
+        bits_per_sample: Bits per PCM sample
+
+    Returns:
+        Header bytes to send before the first PCM chunk
+    """
+    block_align = channels * bits_per_sample // 8
+    byte_rate = sample_rate * block_align
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", UNKNOWN_WAV_SIZE, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, byte_rate, block_align, bits_per_sample,
+        b"data", UNKNOWN_WAV_SIZE,
+    )
+
+
+def pcm16_bytes(samples, scale: float = 1.0) -> bytes:
+    """
+    Pack float samples into little-endian 16-bit PCM
+
+    Scaling, rounding and clipping run as in-place vectorized passes over a
+    single float32 working buffer, so a chunk costs one copy and one cast.
+
+    Args:
+        samples: Float array-like of samples (left untouched)
+        scale: Factor mapping samples onto the int16 range, e.g. 32767.0 for
+            audio in [-1, 1]; IndexTTS2 output is already scaled
+
+    Returns:
+        PCM bytes ready to follow a WAV header
+    """
+    x = np.array(samples, dtype=np.float32)
+    if scale != 1.0:
+        np.multiply(x, scale, out=x)
+    np.rint(x, out=x)
+    np.clip(x, -32768.0, 32767.0, out=x)
+    return x.astype("<i2").tobytes()
+
+
+def wav_duration(path) -> float:
+    """
+    Read the duration of a WAV file from its header
+
+    Args:
+        path: Path to a PCM WAV file
+
+    Returns:
+        Duration in seconds
+    """
+    with wave.open(str(path), "rb") as wav:
+        return wav.getnframes() / float(wav.getframerate())
@@ -4,11 +4,44 @@ TTS Synthesizer wrapper around IndexTTS2
 Manages model initialization and synthesis requests
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Literal, Optional, Tuple
 from datetime import datetime
+import logging
+import os
+import shutil
 import tempfile
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from .audio import pcm16_bytes
+
+logger = logging.getLogger(__name__)
+
+# Weight precisions supported by TTSSynthesizer
+Precision = Literal["fp32", "fp16", "bf16", "int8"]
+PRECISIONS = ("fp32", "fp16", "bf16", "int8")
+
+# Inference backends for the vocoder
+BACKENDS = ("torch", "onnx")
+
+# Precomputed speaker conditioning is stored next to the voice audio
+SPEAKER_COND_SUFFIX = ".spk.npz"
+_SPEAKER_COND_FIELDS = ("spk_cond", "s2mel_style", "s2mel_prompt", "mel", "emo_cond")
+
+# Loaded models, shared by synthesizers created with the same settings
+_MODEL_CACHE: Dict[tuple, Any] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+
+def speaker_conditioning_path(voice_audio_path) -> Path:
+    """Path of the precomputed conditioning file for a voice reference audio"""
+    path = Path(voice_audio_path)
+    return path.with_name(path.stem + SPEAKER_COND_SUFFIX)
 
 
 @dataclass
@@ -16,15 +49,24 @@ class SynthesisRequest:
     """Request for TTS synthesis"""
     text: str
     voice_id: str
-    emotion_vector: Optional[List[float]] = None
+    emotion_vector: Optional[np.ndarray] = None  # float32, shape (8,); lists are converted, tensors kept as is
     emotion_text: Optional[str] = None
     use_emotion_text: bool = False
     use_random: bool = False
     language: str = "auto"
     output_format: str = "wav"  # wav, mp3, ogg, m4a
+    
+    def __post_init__(self):
+        # Torch tensors (rows already on the model device, see
+        # synthesize_segments) are left alone: converting a CUDA tensor to
+        # numpy fails, and a CPU one would undo the single device transfer
+        if isinstance(self.emotion_vector, (list, tuple, np.ndarray)):
+            # One writable float32 array, handed to torch without conversion
+            # (parser vectors are read-only and get copied, 32 bytes)
+            self.emotion_vector = np.require(self.emotion_vector, dtype=np.float32, requirements="W")
 
 
-@dataclass
+@dataclass(slots=True)
 class SynthesisResult:
     """Result of TTS synthesis"""
     success: bool
@@ -32,23 +74,33 @@ class SynthesisResult:
     duration: Optional[float] = None
     sample_rate: int = 24000
     error: Optional[str] = None
-    timestamp: str = None
+    timestamp: Optional[str] = None  # ISO creation time, filled in by timestamp_iso
+    _created: float = field(default_factory=time.time, init=False, repr=False, compare=False)
     
-    def __post_init__(self):
+    @property
+    def timestamp_iso(self) -> str:
+        """ISO timestamp of the result, formatted on first read"""
         if self.timestamp is None:
-            self.timestamp = datetime.now().isoformat()
+            self.timestamp = datetime.fromtimestamp(self._created).isoformat()
+        return self.timestamp
 
 
 class TTSSynthesizer:
     """Wrapper around IndexTTS2 for synthesis"""
     
+    # Sample rate of the BigVGAN vocoder output
+    output_sample_rate = 22050
+    
     def __init__(
         self,
         config_path: Path,
         model_dir: Path,
         use_fp16: bool = True,
         use_cuda_kernel: bool = True,
-        use_deepspeed: bool = False
+        use_deepspeed: bool = False,
+        precision: Optional[Precision] = None,
+        backend: str = "torch",
+        use_torch_compile: bool = False
     ):
         """
         Initialize TTS synthesizer
@@ -59,29 +111,115 @@ class TTSSynthesizer:
             use_fp16: Use half-precision for faster inference
             use_cuda_kernel: Use CUDA kernels if available
             use_deepspeed: Use DeepSpeed for acceleration
+            precision: Weight precision, overriding use_fp16. "bf16" runs the
+                GPT under bf16 autocast, "int8" applies dynamic int8 weight
+                quantization to the GPT (CPU only)
+            backend: "torch", or "onnx" to run the vocoder on ONNX Runtime
+                from model_dir/bigvgan.onnx (see indextts_app.export_onnx)
+            use_torch_compile: Compile the flow-matching decoder with torch.compile
         """
+        if precision is None:
+            precision = "fp16" if use_fp16 else "fp32"
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unsupported precision {precision!r}, expected one of {PRECISIONS}")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported backend {backend!r}, expected one of {BACKENDS}")
+        
         self.config_path = Path(config_path)
         self.model_dir = Path(model_dir)
-        self.use_fp16 = use_fp16
+        self.precision = precision
+        self.use_fp16 = precision == "fp16"
+        self.backend = backend
         self.use_cuda_kernel = use_cuda_kernel
         self.use_deepspeed = use_deepspeed
+        self.use_torch_compile = use_torch_compile
+        # Outputs without an explicit path go here (removed with the synthesizer)
+        self._tmp_dir = Path(tempfile.mkdtemp(prefix="indextts_"))
         self.model = None
         self._load_model()
     
+    def __del__(self):
+        tmp_dir = getattr(self, "_tmp_dir", None)
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    def _temp_output_path(self, output_format: str) -> Path:
+        """Fresh output path in the synthesizer's temp directory (no file is created)"""
+        return self._tmp_dir / f"out_{uuid.uuid4().hex}.{output_format}"
+    
     def _load_model(self):
-        """Load IndexTTS2 model"""
+        """
+        Load the IndexTTS2 model, or reuse one already loaded with the same settings
+        
+        Weights are loaded once per process and configuration, so creating
+        another synthesizer does not load a second copy into (V)RAM.
+        """
+        key = (
+            str(self.config_path.resolve()),
+            str(self.model_dir.resolve()),
+            self.precision,
+            self.backend,
+            self.use_cuda_kernel,
+            self.use_deepspeed,
+            self.use_torch_compile,
+        )
+        with _MODEL_CACHE_LOCK:
+            model = _MODEL_CACHE.get(key)
+            if model is None:
+                self._create_model()
+                _MODEL_CACHE[key] = self.model
+            else:
+                self.model = model
+    
+    def _create_model(self):
+        """Construct IndexTTS2 with this synthesizer's settings"""
         try:
+            # Imported here so the package stays importable without torch
             from indextts.infer_v2 import IndexTTS2
             self.model = IndexTTS2(
                 cfg_path=str(self.config_path),
                 model_dir=str(self.model_dir),
                 use_fp16=self.use_fp16,
                 use_cuda_kernel=self.use_cuda_kernel,
-                use_deepspeed=self.use_deepspeed
+                use_deepspeed=self.use_deepspeed,
+                use_torch_compile=self.use_torch_compile
             )
+            self._apply_precision()
+            if self.backend == "onnx":
+                from indextts_app.export_onnx import VOCODER_ONNX_NAME
+                self.model.bigvgan = _OnnxVocoder(self.model_dir / VOCODER_ONNX_NAME)
         except Exception as e:
             raise RuntimeError(f"Failed to load IndexTTS2 model: {e}")
     
+    def _apply_precision(self):
+        """Convert the loaded model to the requested precision"""
+        import torch
+        
+        if self.precision == "bf16":
+            # IndexTTS2 runs the GPT under autocast with model.dtype, so this
+            # switches decoding to bf16 while keeping fp32 master weights
+            self.model.dtype = torch.bfloat16
+        elif self.precision == "int8":
+            if str(self.model.device) != "cpu":
+                raise ValueError("int8 precision is only supported on CPU")
+            _quantize_int8(self.model.gpt)
+    
+    def warmup(self, voice_audio_path: Path, text: str = "This is a warmup utterance."):
+        """
+        Run one full synthesis and discard the audio
+        
+        Triggers lazy initialization, kernel autotuning and torch.compile
+        tracing so the first real request does not pay for them.
+        
+        Args:
+            voice_audio_path: Path to a voice reference audio
+            text: Text to synthesize
+        """
+        result = self.synthesize(SynthesisRequest(text=text, voice_id="warmup"), Path(voice_audio_path))
+        if not result.success:
+            raise RuntimeError(f"Warm-up synthesis failed: {result.error}")
+        Path(result.audio_path).unlink(missing_ok=True)
+    
     def synthesize(
         self,
         request: SynthesisRequest,
@@ -94,7 +232,7 @@ class TTSSynthesizer:
         Args:
             request: Synthesis request
             voice_audio_path: Path to voice reference audio
-            output_path: Where to save output (optional, creates temp file if not provided)
+            output_path: Where to save output (optional, defaults to a new file in the synthesizer's temp directory)
             
         Returns:
             SynthesisResult with success status and audio path
@@ -106,44 +244,25 @@ class TTSSynthesizer:
             )
         
         if output_path is None:
-            # Create temporary file
-            temp_file = tempfile.NamedTemporaryFile(
-                suffix=f".{request.output_format}",
-                delete=False
-            )
-            output_path = Path(temp_file.name)
-            temp_file.close()
+            output_path = self._temp_output_path(request.output_format)
         
         try:
-            # Build synthesis kwargs
-            kwargs = {
-                'spk_audio_prompt': str(voice_audio_path),
-                'text': request.text,
-                'output_path': str(output_path),
-                'verbose': False
-            }
-            
-            # Add emotion parameters if provided
-            if request.emotion_vector is not None:
-                kwargs['emo_vector'] = request.emotion_vector
-            
-            if request.emotion_text is not None:
-                kwargs['emo_text'] = request.emotion_text
-                kwargs['use_emo_text'] = request.use_emotion_text
-            
-            if request.use_emotion_text:
-                kwargs['use_emo_text'] = True
-            
-            kwargs['use_random'] = request.use_random
+            self._prepare_voice(voice_audio_path)
+            kwargs = self._build_infer_kwargs(request, voice_audio_path, str(output_path))
             
             # Perform inference
             self.model.infer(**kwargs)
             
-            # Verify output file was created
-            if not output_path.exists():
+            # Verify output file was created and is not empty (one stat)
+            try:
+                size = output_path.stat().st_size
+            except FileNotFoundError:
+                size = None
+            if not size:
+                output_path.unlink(missing_ok=True)
                 return SynthesisResult(
                     success=False,
-                    error="Output file not created"
+                    error="Output file not created" if size is None else "Output file is empty"
                 )
             
             return SynthesisResult(
@@ -154,8 +273,214 @@ class TTSSynthesizer:
             
         except Exception as e:
             # Clean up temp file on error
-            if output_path.exists():
-                output_path.unlink()
+            output_path.unlink(missing_ok=True)
+            return SynthesisResult(
+                success=False,
+                error=str(e)
+            )
+    
+    def stream(
+        self,
+        request: SynthesisRequest,
+        voice_audio_path: Path
+    ) -> Iterator[bytes]:
+        """
+        Synthesize speech incrementally
+        
+        IndexTTS2 splits the text into segments and vocodes them one by one;
+        each segment (and the silence inserted after it) is yielded as soon
+        as it is ready.
+        
+        Args:
+            request: Synthesis request
+            voice_audio_path: Path to voice reference audio
+            
+        Yields:
+            Mono 16-bit little-endian PCM chunks at ``output_sample_rate``
+        """
+        if self.model is None:
+            raise RuntimeError("Model not loaded")
+        
+        self._prepare_voice(voice_audio_path)
+        kwargs = self._build_infer_kwargs(request, voice_audio_path, None)
+        for wav in self.model.infer(stream_return=True, **kwargs):
+            if wav is None:
+                continue
+            yield pcm16_bytes(wav.numpy())
+    
+    def precompute_speaker_conditioning(self, voice_audio_path: Path) -> Optional[Path]:
+        """
+        Encode a voice's reference audio and store the conditioning tensors
+        
+        Args:
+            voice_audio_path: Path to voice reference audio
+            
+        Returns:
+            Path to the stored conditioning file, or None if it could not be written
+        """
+        tensors = self._encode_speaker(str(voice_audio_path))
+        return self._save_speaker_conditioning(voice_audio_path, tensors)
+    
+    def _encode_speaker(self, prompt: str) -> Dict[str, Any]:
+        """Run the speaker and emotion encoders on a reference audio"""
+        spk_cond, style, prompt_condition, mel = self.model.get_speaker_conditioning(prompt)
+        emo_cond = self.model.get_emotion_conditioning(prompt)
+        return dict(zip(_SPEAKER_COND_FIELDS, (spk_cond, style, prompt_condition, mel, emo_cond)))
+    
+    @staticmethod
+    def _save_speaker_conditioning(voice_audio_path: Path, tensors: Dict[str, Any]) -> Optional[Path]:
+        """
+        Write conditioning tensors next to the voice audio
+        
+        Saving is best effort: a read-only or full voice directory is logged
+        and the caller keeps using the tensors in memory.
+        """
+        path = speaker_conditioning_path(voice_audio_path)
+        tmp_path = path.with_name(path.name + ".part")
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **{name: t.detach().cpu().numpy() for name, t in tensors.items()})
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save speaker conditioning to {path}: {e}")
+            try:
+                tmp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+            return None
+        return path
+    
+    def _prepare_voice(self, voice_audio_path: Path):
+        """
+        Load a voice's precomputed conditioning into the model's speaker cache
+        
+        IndexTTS2 re-encodes the reference audio whenever the speaker prompt
+        changes; seeding its cache from disk skips the audio decode and the
+        speaker/semantic encoders. Voices without a stored (or with a stale)
+        conditioning file are encoded once and persisted when possible.
+        """
+        prompt = str(voice_audio_path)
+        if self.model.cache_spk_audio_prompt == prompt and self.model.cache_emo_audio_prompt == prompt:
+            return
+        
+        path = speaker_conditioning_path(voice_audio_path)
+        try:
+            stale = path.stat().st_mtime < os.stat(voice_audio_path).st_mtime
+        except FileNotFoundError:
+            stale = True
+        if stale:
+            tensors = self._encode_speaker(prompt)
+            self._save_speaker_conditioning(voice_audio_path, tensors)
+        else:
+            import torch
+            
+            with np.load(path) as data:
+                tensors = {
+                    name: torch.from_numpy(data[name]).to(self.model.device)
+                    for name in _SPEAKER_COND_FIELDS
+                }
+        self.model.cache_spk_cond = tensors["spk_cond"]
+        self.model.cache_s2mel_style = tensors["s2mel_style"]
+        self.model.cache_s2mel_prompt = tensors["s2mel_prompt"]
+        self.model.cache_mel = tensors["mel"]
+        self.model.cache_spk_audio_prompt = prompt
+        self.model.cache_emo_cond = tensors["emo_cond"]
+        self.model.cache_emo_audio_prompt = prompt
+    
+    @staticmethod
+    def _build_infer_kwargs(
+        request: SynthesisRequest,
+        voice_audio_path: Path,
+        output_path: Optional[str]
+    ) -> dict:
+        """Build keyword arguments for IndexTTS2.infer from a request"""
+        kwargs = {
+            'spk_audio_prompt': str(voice_audio_path),
+            'text': request.text,
+            'output_path': output_path,
+            'verbose': False
+        }
+        
+        # Add emotion parameters if provided
+        if request.emotion_vector is not None:
+            kwargs['emo_vector'] = request.emotion_vector
+        
+        if request.emotion_text is not None:
+            kwargs['emo_text'] = request.emotion_text
+            kwargs['use_emo_text'] = request.use_emotion_text
+        
+        if request.use_emotion_text:
+            kwargs['use_emo_text'] = True
+        
+        kwargs['use_random'] = request.use_random
+        return kwargs
+    
+    def synthesize_segments(
+        self,
+        texts: List[str],
+        emotion_matrix,
+        voice_audio_path: Path,
+        output_path: Optional[Path] = None,
+        output_format: str = "wav"
+    ) -> SynthesisResult:
+        """
+        Synthesize consecutive text segments, each with its own emotion vector
+        
+        The whole (N, 8) emotion matrix is copied to the model device in one
+        transfer; each segment then uses its row in place. Segment audio is
+        joined into a single file.
+        
+        Args:
+            texts: Segment texts, in order
+            emotion_matrix: Float array of shape (N, 8), row i for texts[i]
+            voice_audio_path: Path to voice reference audio
+            output_path: Where to save output (optional, defaults to a new file in the synthesizer's temp directory)
+            output_format: Extension of the temp file when output_path is not given
+            
+        Returns:
+            SynthesisResult with success status and audio path
+        """
+        if self.model is None:
+            return SynthesisResult(
+                success=False,
+                error="Model not loaded"
+            )
+        
+        import torch
+        import torchaudio
+        
+        if output_path is None:
+            output_path = self._temp_output_path(output_format)
+        
+        try:
+            self._prepare_voice(voice_audio_path)
+            
+            emotions = torch.from_numpy(np.ascontiguousarray(emotion_matrix, dtype=np.float32))
+            if emotions.shape != (len(texts), 8):
+                raise ValueError(f"Expected emotion matrix of shape ({len(texts)}, 8), got {tuple(emotions.shape)}")
+            if str(self.model.device).startswith("cuda"):
+                emotions = emotions.pin_memory().to(self.model.device, non_blocking=True)
+            else:
+                emotions = emotions.to(self.model.device)
+            
+            wavs = []
+            for text, emotion_vector in zip(texts, emotions):
+                request = SynthesisRequest(text=text, voice_id="", emotion_vector=emotion_vector)
+                kwargs = self._build_infer_kwargs(request, voice_audio_path, None)
+                wavs.extend(w for w in self.model.infer(stream_return=True, **kwargs) if w is not None)
+            if not wavs:
+                raise RuntimeError("No audio generated")
+            
+            torchaudio.save(str(output_path), torch.cat(wavs, dim=1).type(torch.int16), self.output_sample_rate)
+            return SynthesisResult(
+                success=True,
+                audio_path=str(output_path),
+                sample_rate=self.output_sample_rate
+            )
+        
+        except Exception as e:
+            # Clean up temp file on error
+            output_path.unlink(missing_ok=True)
             return SynthesisResult(
                 success=False,
                 error=str(e)
@@ -171,11 +496,11 @@ class TTSSynthesizer:
         """
         Synthesize with multiple emotion segments
         
-        Currently does simple stitching by using the first emotion for the whole text.
-        In future, this could be enhanced to do segment-level synthesis and combining.
+        Each segment is synthesized with its own emotion (see
+        synthesize_segments) and the audio is joined.
         
         Args:
-            text: Full text to synthesize
+            text: Full text to synthesize (used when there are no segments)
             voice_audio_path: Voice reference audio
             emotion_segments: List of (text_segment, emotion_vector) tuples
             output_path: Output path
@@ -190,11 +515,59 @@ class TTSSynthesizer:
             )
             return self.synthesize(request, voice_audio_path, output_path)
         
-        # Use first emotion for now
-        _, first_emotion = emotion_segments[0]
-        request = SynthesisRequest(
-            text=text,
-            voice_id="default",
-            emotion_vector=first_emotion
-        )
-        return self.synthesize(request, voice_audio_path, output_path)
+        texts = [segment for segment, _ in emotion_segments]
+        matrix = np.array([vector for _, vector in emotion_segments], dtype=np.float32)
+        return self.synthesize_segments(texts, matrix, voice_audio_path, output_path)
+
+
+def _conv1d_to_linear(module) -> None:
+    """Replace transformers Conv1D layers with equivalent nn.Linear layers (in place)"""
+    import torch
+    from transformers.pytorch_utils import Conv1D
+    
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            # Conv1D stores its weight as (in_features, out_features)
+            in_features, out_features = child.weight.shape
+            linear = torch.nn.Linear(in_features, out_features)
+            linear.weight.data = child.weight.data.t().contiguous()
+            linear.bias.data = child.bias.data
+            setattr(module, name, linear)
+        else:
+            _conv1d_to_linear(child)
+
+
+def _quantize_int8(module) -> None:
+    """
+    Apply dynamic int8 weight quantization to a module's linear layers
+    
+    The GPT-2 blocks of the decoder use Conv1D projections, which
+    quantize_dynamic does not recognise, so they are first converted to
+    nn.Linear. Activations (and the attention softmax) stay in float.
+    
+    Args:
+        module: Module to quantize in place
+    """
+    import torch
+    
+    _conv1d_to_linear(module)
+    torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+class _OnnxVocoder:
+    """Drop-in replacement for IndexTTS2's BigVGAN module backed by ONNX Runtime"""
+    
+    def __init__(self, onnx_path: Path):
+        import onnxruntime as ort
+        
+        providers = [
+            provider for provider in ("CoreMLExecutionProvider", "CPUExecutionProvider")
+            if provider in ort.get_available_providers()
+        ]
+        self.session = ort.InferenceSession(str(onnx_path), providers=providers)
+    
+    def __call__(self, mel):
+        import torch
+        
+        (wav,) = self.session.run(None, {"mel": mel.detach().cpu().numpy()})
+        return torch.from_numpy(wav).to(mel.device)
@@ -2,11 +2,25 @@
 Audio extraction from media files
 
 Extract audio from MP4, MP3, WAV, and other formats
+
+When PyAV is installed, probing and extraction run in-process on libav
+(no ffmpeg/ffprobe process per call); otherwise the ffmpeg CLI is used.
 """
 
+import asyncio
+import functools
+import json
+import os
 import subprocess
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import av
+except ImportError:  # Optional: fall back to the ffmpeg CLI
+    av = None
 
 
 class VoiceExtractor:
@@ -20,7 +34,11 @@ class VoiceExtractor:
     @staticmethod
     def get_audio_info(file_path: Path) -> Optional[dict]:
         """
-        Get audio information using ffprobe
+        Get audio information using PyAV (or ffprobe)
+        
+        Results are memoized per (path, mtime, size), so probing an unchanged
+        file again costs a stat. Failed probes (timeouts, unreadable files)
+        are not memoized and run again on the next call.
         
         Args:
             file_path: Path to media file
@@ -29,26 +47,52 @@ class VoiceExtractor:
             Dict with duration, sample_rate, channels, etc.
         """
         try:
-            cmd = [
-                'ffprobe',
-                '-v', 'error',
-                '-select_streams', 'a:0',
-                '-show_entries', 'stream=duration,sample_rate,channels',
-                '-of', 'default=noprint_wrappers=1:nokey=1:nokey=1',
-                str(file_path)
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        try:
+            info = _probe_cached(str(file_path), st.st_mtime_ns, st.st_size)
+        except _ProbeFailed:
+            return None
+        return dict(info)
+    
+    @staticmethod
+    def _probe_audio_info(file_path: Path) -> Optional[dict]:
+        """Uncached implementation of get_audio_info()"""
+        if av is not None:
+            return VoiceExtractor._get_audio_info_av(file_path)
+        try:
+            result = subprocess.run(
+                VoiceExtractor._build_probe_cmd(file_path),
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
             if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
-                return {
-                    'duration': float(lines[0]) if lines[0] else 0.0,
-                    'sample_rate': int(lines[1]) if len(lines) > 1 and lines[1] else 24000,
-                    'channels': int(lines[2]) if len(lines) > 2 and lines[2] else 1,
-                }
+                return VoiceExtractor._parse_probe(result.stdout)
         except Exception:
             pass
         return None
     
+    @staticmethod
+    def _get_audio_info_av(file_path: Path) -> Optional[dict]:
+        """get_audio_info on PyAV"""
+        try:
+            with av.open(str(file_path)) as container:
+                stream = container.streams.audio[0]
+                if stream.duration is not None:
+                    duration = float(stream.duration * stream.time_base)
+                else:
+                    duration = (container.duration or 0) / av.time_base
+                return {
+                    'duration': duration,
+                    'sample_rate': stream.rate or 24000,
+                    'channels': len(stream.layout.channels) or 1,
+                    'codec_name': stream.codec_context.name,
+                }
+        except Exception:
+            return None
+    
     @staticmethod
     def extract_audio(
         input_path: Path,
@@ -72,43 +116,271 @@ class VoiceExtractor:
         Returns:
             True if successful
         """
-        cmd = [
-            'ffmpeg',
-            '-i', str(input_path),
-            '-acodec', 'pcm_s16le',  # WAV codec
-            '-ar', str(sample_rate),  # Sample rate
-            '-ac', str(channels),  # Audio channels
-            '-y',  # Overwrite output
-            str(output_path)
-        ]
+        if av is not None:
+            return VoiceExtractor._extract_audio_av(
+                input_path, output_path, sample_rate, channels, start_time, duration
+            )
+        try:
+            # Shares the memoized probe with get_audio_info, so probing and
+            # extracting the same file launches ffprobe once
+            info = VoiceExtractor.get_audio_info(input_path)
+            copy = info is not None and VoiceExtractor._can_copy(info, sample_rate, channels)
+            
+            # Stream-copy when the audio is already in the target format and
+            # only transcode when needed (or when the copy fails)
+            for codec_copy in ((True, False) if copy else (False,)):
+                cmd = VoiceExtractor._build_extract_cmd(
+                    input_path, output_path, sample_rate, channels, start_time, duration, codec_copy
+                )
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    timeout=300,  # 5 minutes timeout
+                    check=False
+                )
+                if result.returncode == 0:
+                    return True
+            return False
+        except subprocess.TimeoutExpired:
+            return False
+    
+    @staticmethod
+    async def extract_audio_async(
+        input_path: Path,
+        output_path: Path,
+        sample_rate: int = 24000,
+        channels: int = 1,
+        start_time: Optional[float] = None,
+        duration: Optional[float] = None
+    ) -> bool:
+        """
+        Extract audio from media file without blocking the event loop
         
-        # Add time trimming if specified
-        if start_time is not None or duration is not None:
-            trim_cmd = ['ffmpeg', '-i', str(input_path)]
-            if start_time is not None:
-                trim_cmd.extend(['-ss', str(start_time)])
-            if duration is not None:
-                trim_cmd.extend(['-t', str(duration)])
-            trim_cmd.extend([
-                '-acodec', 'pcm_s16le',
-                '-ar', str(sample_rate),
-                '-ac', str(channels),
-                '-y',
-                str(output_path)
-            ])
-            cmd = trim_cmd
+        Same as extract_audio, but the work runs in a thread (PyAV) or as an
+        asyncio subprocess (ffmpeg) so other requests keep being served.
         
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                timeout=300,  # 5 minutes timeout
-                check=False
+        Returns:
+            True if successful
+        """
+        if av is not None:
+            return await asyncio.to_thread(
+                VoiceExtractor._extract_audio_av,
+                input_path, output_path, sample_rate, channels, start_time, duration
             )
-            return result.returncode == 0
-        except subprocess.TimeoutExpired:
+        # The memoized probe: callers that probe the same file before or
+        # after extracting (add_voice_from_file) do not launch ffprobe again
+        info = await asyncio.to_thread(VoiceExtractor.get_audio_info, input_path)
+        copy = info is not None and VoiceExtractor._can_copy(info, sample_rate, channels)
+        
+        for codec_copy in ((True, False) if copy else (False,)):
+            cmd = VoiceExtractor._build_extract_cmd(
+                input_path, output_path, sample_rate, channels, start_time, duration, codec_copy
+            )
+            returncode, _ = await VoiceExtractor._run_async(cmd, timeout=300)  # 5 minutes timeout
+            if returncode == 0:
+                return True
+        return False
+    
+    @staticmethod
+    def _extract_audio_av(
+        input_path: Path,
+        output_path: Path,
+        sample_rate: int,
+        channels: int,
+        start_time: Optional[float],
+        duration: Optional[float]
+    ) -> bool:
+        """
+        extract_audio on PyAV: decode, resample and write 16-bit PCM WAV in-process
+        
+        The clip is trimmed to whole decoded frames (a few tens of
+        milliseconds), after seeking close to start_time in the container.
+        """
+        layout = "mono" if channels == 1 else "stereo"
+        try:
+            with av.open(str(input_path)) as src:
+                with av.open(str(output_path), "w", format="wav") as dst:
+                    out = dst.add_stream("pcm_s16le", rate=sample_rate, layout=layout)
+                    for frame in VoiceExtractor._decode_av(src, sample_rate, layout, start_time, duration):
+                        dst.mux(out.encode(frame))
+                    # Flush the encoder
+                    dst.mux(out.encode(None))
+            return True
+        except Exception:
             return False
     
+    @staticmethod
+    def _decode_av(src, sample_rate: int, layout: str, start_time: Optional[float], duration: Optional[float]):
+        """
+        Yield s16 frames of the first audio stream of an open PyAV container
+        
+        Frames are resampled to the target rate/layout and trimmed to whole
+        decoded frames (a few tens of milliseconds), after seeking close to
+        start_time in the container.
+        """
+        start = start_time or 0.0
+        end = start + duration if duration is not None else None
+        stream = src.streams.audio[0]
+        if start > 0:
+            # Lands on the keyframe at or before start; earlier frames are skipped below
+            src.seek(int(start / stream.time_base), stream=stream)
+        resampler = av.AudioResampler(format="s16", layout=layout, rate=sample_rate)
+        
+        for frame in src.decode(stream):
+            if frame.time is not None:
+                if frame.time + frame.samples / frame.sample_rate <= start:
+                    continue
+                if end is not None and frame.time >= end:
+                    break
+            yield from resampler.resample(frame)
+        # Flush the resampler
+        yield from resampler.resample(None)
+    
+    @staticmethod
+    def extract_audio_to_array(
+        input_path: Path,
+        sample_rate: int = 24000,
+        channels: int = 1,
+        start_time: Optional[float] = None,
+        duration: Optional[float] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Decode audio from a media file straight into memory
+        
+        Same conversion as extract_audio, but the PCM is returned instead of
+        written to a WAV file, for callers that only need the samples.
+        
+        Args:
+            input_path: Input media file
+            sample_rate: Target sample rate in Hz
+            channels: Number of audio channels
+            start_time: Start time in seconds (optional)
+            duration: Duration in seconds (optional)
+            
+        Returns:
+            int16 samples, shape (frames,) for mono or (frames, channels),
+            or None if decoding failed
+        """
+        if av is not None:
+            layout = "mono" if channels == 1 else "stereo"
+            try:
+                with av.open(str(input_path)) as src:
+                    chunks = [
+                        frame.to_ndarray().reshape(-1)
+                        for frame in VoiceExtractor._decode_av(src, sample_rate, layout, start_time, duration)
+                    ]
+            except Exception:
+                return None
+            pcm = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int16)
+        else:
+            cmd = VoiceExtractor._build_extract_cmd(
+                input_path, Path("-"), sample_rate, channels, start_time, duration, output_format="s16le"
+            )
+            try:
+                result = subprocess.run(cmd, capture_output=True, timeout=300, check=False)
+            except subprocess.TimeoutExpired:
+                return None
+            if result.returncode != 0:
+                return None
+            pcm = np.frombuffer(result.stdout, dtype="<i2")
+        return pcm if channels == 1 else pcm.reshape(-1, channels)
+    
+    @staticmethod
+    async def _run_async(cmd: List[str], timeout: float) -> Tuple[Optional[int], str]:
+        """Run a command as an asyncio subprocess; returns (returncode, stdout)"""
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return None, ""
+        return proc.returncode, stdout.decode(errors="replace")
+    
+    @staticmethod
+    def _build_probe_cmd(input_path: Path) -> List[str]:
+        """Build the ffprobe command line describing the first audio stream"""
+        return [
+            'ffprobe',
+            '-v', 'error',
+            '-select_streams', 'a:0',
+            '-show_entries', 'stream=codec_name,sample_rate,channels,duration:format=duration',
+            '-of', 'json',
+            str(input_path)
+        ]
+    
+    @staticmethod
+    def _parse_probe(probe_output: str) -> Optional[dict]:
+        """Audio info dict from ffprobe JSON output (None without an audio stream)"""
+        try:
+            probe = json.loads(probe_output)
+            stream = probe["streams"][0]
+            # Some containers only report the duration at the format level
+            duration = stream.get("duration") or probe.get("format", {}).get("duration")
+            return {
+                'duration': float(duration) if duration else 0.0,
+                'sample_rate': int(stream.get("sample_rate") or 24000),
+                'channels': int(stream.get("channels") or 1),
+                'codec_name': stream.get("codec_name"),
+            }
+        except (ValueError, KeyError, IndexError):
+            return None
+    
+    @staticmethod
+    def _can_copy(info: dict, sample_rate: int, channels: int) -> bool:
+        """Whether the probed audio stream can be copied into the output WAV as-is"""
+        return (
+            info.get("codec_name") == "pcm_s16le"
+            and info["sample_rate"] == sample_rate
+            and info["channels"] == channels
+        )
+    
+    @staticmethod
+    def _build_extract_cmd(
+        input_path: Path,
+        output_path: Path,
+        sample_rate: int,
+        channels: int,
+        start_time: Optional[float],
+        duration: Optional[float],
+        codec_copy: bool = False,
+        output_format: Optional[str] = None
+    ) -> List[str]:
+        """Build the ffmpeg command line for an extraction (output_format forces the muxer, e.g. raw "s16le")"""
+        cmd = ['ffmpeg', '-loglevel', 'error']
+        
+        # Trim on the input side: ffmpeg seeks in the container instead of
+        # decoding and discarding everything before start_time
+        if start_time is not None:
+            cmd.extend(['-ss', str(start_time)])
+        if duration is not None:
+            cmd.extend(['-t', str(duration)])
+        
+        cmd.extend([
+            '-i', str(input_path),
+            '-vn',  # Drop video so it is never decoded
+        ])
+        if codec_copy:
+            # Audio already matches the target format: demux without re-encoding
+            cmd.extend(['-acodec', 'copy'])
+        else:
+            cmd.extend([
+                '-acodec', 'pcm_s16le',  # WAV codec
+                '-ar', str(sample_rate),  # Sample rate
+                '-ac', str(channels),  # Audio channels
+            ])
+        if output_format is not None:
+            cmd.extend(['-f', output_format])
+        cmd.extend([
+            '-y',  # Overwrite output
+            str(output_path)
+        ])
+        return cmd
+    
     @staticmethod
     def extract_audio_segment(
         input_path: Path,
@@ -140,6 +412,19 @@ class VoiceExtractor:
         )
 
 
+class _ProbeFailed(Exception):
+    """Raised by _probe_cached so lru_cache does not memoize the failure"""
+
+
+@functools.lru_cache(maxsize=512)
+def _probe_cached(path: str, mtime_ns: int, size: int) -> dict:
+    """Memoized probe; the file's mtime and size invalidate stale entries"""
+    info = VoiceExtractor._probe_audio_info(Path(path))
+    if info is None:
+        raise _ProbeFailed(path)
+    return info
+
+
 def extract_audio_from_file(
     file_path: Path,
     output_path: Path,
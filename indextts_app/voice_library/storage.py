@@ -6,11 +6,54 @@ Manages voice profiles with metadata for voice cloning
 
 import json
 import sqlite3
-from dataclasses import dataclass, asdict, field
+import threading
+import time
+from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Any, Dict, Iterator, List, Optional
 import hashlib
+import shutil
+
+from .extractor import VoiceExtractor
+from ..utils import speaker_conditioning_path
+
+# Voice audio is stored as 16-bit mono WAV at this rate
+VOICE_SAMPLE_RATE = 24000
+
+
+class _RawJSON(str):
+    """JSON text read from the database, not decoded yet"""
+
+
+class _LazyJSONField:
+    """
+    Dataclass field that accepts raw JSON and decodes it on first access
+    
+    Rows are loaded with their tags/metadata columns wrapped in _RawJSON, so
+    listing voices does not pay for json.loads on values nobody reads.
+    """
+    
+    def __init__(self, factory):
+        self.factory = factory
+    
+    def __set_name__(self, owner, name):
+        self.attr = "_" + name
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            # Dataclass default: __init__ passes the descriptor back to __set__
+            return self
+        value = obj.__dict__[self.attr]
+        if isinstance(value, _RawJSON):
+            value = json.loads(value) if value else self.factory()
+            obj.__dict__[self.attr] = value
+        return value
+    
+    def __set__(self, obj, value):
+        if value is self:
+            value = self.factory()
+        obj.__dict__[self.attr] = value
 
 
 @dataclass
@@ -25,8 +68,8 @@ class VoiceProfile:
     duration: float = 0.0  # Duration in seconds
     sample_rate: int = 24000
     language: str = "auto"
-    tags: List[str] = field(default_factory=list)
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    tags: List[str] = _LazyJSONField(list)
+    metadata: Dict[str, Any] = _LazyJSONField(dict)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for storage"""
@@ -48,12 +91,45 @@ class VoiceLibrary:
         """
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection per thread, reused across calls
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self._init_db()
     
+    def _conn(self) -> sqlite3.Connection:
+        """Connection for the calling thread (opened and configured on first use)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-8000")
+            # Read pages through a memory map instead of read(2) calls
+            conn.execute("PRAGMA mmap_size=268435456")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    def close(self):
+        """Close the connections opened by all threads"""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+    
+    def __del__(self):
+        self.close()
+    
     def _init_db(self):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
+        # Table and indexes in one script (a single call into SQLite)
+        with self._conn() as conn:
+            conn.executescript("""
             CREATE TABLE IF NOT EXISTS voices (
                 id TEXT PRIMARY KEY,
                 name TEXT UNIQUE NOT NULL,
@@ -66,76 +142,126 @@ class VoiceLibrary:
                 language TEXT DEFAULT 'auto',
                 tags TEXT,
                 metadata TEXT
-            )
+            );
+            -- name is already indexed by its UNIQUE constraint
+            CREATE INDEX IF NOT EXISTS idx_voices_created_at ON voices(created_at DESC);
+            CREATE INDEX IF NOT EXISTS idx_voices_language ON voices(language);
             """)
-            conn.commit()
     
     def add_voice(self, profile: VoiceProfile) -> bool:
         """Add a voice profile to library"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                data = profile.to_dict()
+        return self.add_voices([profile])[0]
+    
+    def add_voices(self, profiles: List[VoiceProfile]) -> List[bool]:
+        """
+        Add several voice profiles in a single transaction
+        
+        Args:
+            profiles: Profiles to insert
+            
+        Returns:
+            Per profile, True if inserted, False if its id or name was taken
+        """
+        # One commit (and journal sync) for the whole batch; rows are inserted
+        # one statement at a time so each gets an accurate result
+        with self._conn() as conn:
+            return [
                 conn.execute("""
-                INSERT INTO voices 
+                INSERT OR IGNORE INTO voices 
                 (id, name, audio_path, created_at, description, source_file, 
                  duration, sample_rate, language, tags, metadata)
                 VALUES 
                 (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    data['id'], data['name'], data['audio_path'],
-                    data['created_at'], data['description'], data['source_file'],
-                    data['duration'], data['sample_rate'], data['language'],
-                    data['tags'], data['metadata']
-                ))
-                conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            return False
+                """, self._profile_row(profile)).rowcount > 0
+                for profile in profiles
+            ]
+    
+    @staticmethod
+    def _profile_row(profile: VoiceProfile) -> tuple:
+        """Column values of a profile, in table order"""
+        data = profile.to_dict()
+        return (
+            data['id'], data['name'], data['audio_path'],
+            data['created_at'], data['description'], data['source_file'],
+            data['duration'], data['sample_rate'], data['language'],
+            data['tags'], data['metadata']
+        )
     
     def get_voice(self, voice_id: str) -> Optional[VoiceProfile]:
         """Retrieve a voice profile by ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT * FROM voices WHERE id = ?",
-                (voice_id,)
-            )
-            row = cursor.fetchone()
-            if row:
-                return self._row_to_profile(row)
+        row = self._conn().execute(
+            "SELECT * FROM voices WHERE id = ?",
+            (voice_id,)
+        ).fetchone()
+        if row:
+            return self._row_to_profile(row)
         return None
     
+    def get_voices(self, voice_ids: List[str]) -> Dict[str, VoiceProfile]:
+        """
+        Retrieve several voice profiles with one query per 900 IDs
+        
+        Args:
+            voice_ids: IDs to look up
+            
+        Returns:
+            Dictionary mapping each found ID to its profile (unknown IDs are left out)
+        """
+        voices = {}
+        ids = list(dict.fromkeys(voice_ids))
+        conn = self._conn()
+        # Stay below SQLite's default limit of 999 bound parameters
+        for i in range(0, len(ids), 900):
+            chunk = ids[i:i + 900]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = conn.execute(f"SELECT * FROM voices WHERE id IN ({placeholders})", chunk)
+            for row in cursor:
+                voices[row['id']] = self._row_to_profile(row)
+        return voices
+    
     def get_voice_by_name(self, name: str) -> Optional[VoiceProfile]:
         """Retrieve a voice profile by name"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT * FROM voices WHERE name = ?",
-                (name,)
-            )
-            row = cursor.fetchone()
-            if row:
-                return self._row_to_profile(row)
+        row = self._conn().execute(
+            "SELECT * FROM voices WHERE name = ?",
+            (name,)
+        ).fetchone()
+        if row:
+            return self._row_to_profile(row)
         return None
     
-    def list_voices(self) -> List[VoiceProfile]:
-        """List all voices in library"""
-        voices = []
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT * FROM voices ORDER BY created_at DESC")
-            for row in cursor:
-                voices.append(self._row_to_profile(row))
-        return voices
+    def iter_voices(self) -> Iterator[VoiceProfile]:
+        """Yield voices newest first, decoding one row at a time"""
+        cursor = self._conn().execute("SELECT * FROM voices ORDER BY created_at DESC")
+        for row in cursor:
+            yield self._row_to_profile(row)
+    
+    def list_voices(self, limit: Optional[int] = None, offset: int = 0) -> List[VoiceProfile]:
+        """
+        List voices in library, newest first
+        
+        Args:
+            limit: Maximum number of voices to return (None for all)
+            offset: Number of voices to skip
+            
+        Returns:
+            List of voice profiles
+        """
+        cursor = self._conn().execute(
+            "SELECT * FROM voices ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset)
+        )
+        return [self._row_to_profile(row) for row in cursor]
     
     def delete_voice(self, voice_id: str) -> bool:
         """Delete a voice profile"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.execute("DELETE FROM voices WHERE id = ?", (voice_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+        return cursor.rowcount > 0
     
     def update_voice(self, profile: VoiceProfile) -> bool:
         """Update a voice profile"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conn() as conn:
                 data = profile.to_dict()
                 conn.execute("""
                 UPDATE voices 
@@ -145,26 +271,25 @@ class VoiceLibrary:
                     data['name'], data['description'], data['tags'],
                     data['metadata'], data['language'], data['id']
                 ))
-                conn.commit()
             return True
         except sqlite3.IntegrityError:
             return False
     
     @staticmethod
-    def _row_to_profile(row: tuple) -> VoiceProfile:
+    def _row_to_profile(row: sqlite3.Row) -> VoiceProfile:
         """Convert database row to VoiceProfile"""
         return VoiceProfile(
-            id=row[0],
-            name=row[1],
-            audio_path=row[2],
-            created_at=row[3],
-            description=row[4] or "",
-            source_file=row[5] or "",
-            duration=row[6] or 0.0,
-            sample_rate=row[7] or 24000,
-            language=row[8] or "auto",
-            tags=json.loads(row[9]) if row[9] else [],
-            metadata=json.loads(row[10]) if row[10] else {}
+            id=row['id'],
+            name=row['name'],
+            audio_path=row['audio_path'],
+            created_at=row['created_at'],
+            description=row['description'] or "",
+            source_file=row['source_file'] or "",
+            duration=row['duration'] or 0.0,
+            sample_rate=row['sample_rate'] or 24000,
+            language=row['language'] or "auto",
+            tags=_RawJSON(row['tags'] or ""),
+            metadata=_RawJSON(row['metadata'] or "")
         )
 
 
@@ -186,12 +311,15 @@ class VoiceLibraryManager:
             db_path = self.voice_dir / "voices.db"
         
         self.library = VoiceLibrary(db_path)
+        # Bumped on every change so callers can cache views of the library
+        self.version = 0
     
     def create_voice_id(self, name: str) -> str:
         """Generate unique voice ID from name"""
-        timestamp = datetime.now().isoformat()
-        data = f"{name}:{timestamp}".encode()
-        return hashlib.sha256(data).hexdigest()[:12]
+        # Nanosecond clock: unique per call without formatting a date
+        data = f"{name}:{time.time_ns()}".encode()
+        # Uniqueness tag, not a security digest: 6-byte BLAKE2b = 12 hex chars
+        return hashlib.blake2b(data, digest_size=6).hexdigest()
     
     def add_voice_from_file(
         self,
@@ -201,11 +329,15 @@ class VoiceLibraryManager:
         description: str = "",
         language: str = "auto",
         tags: Optional[List[str]] = None,
+        created_at: Optional[str] = None,
         **metadata
     ) -> Optional[VoiceProfile]:
         """
         Add a voice from an audio file
         
+        The audio is stored in the voice directory as a 24 kHz mono WAV
+        named after the voice ID.
+        
         Args:
             name: Display name for the voice
             audio_path: Path to audio file
@@ -213,6 +345,8 @@ class VoiceLibraryManager:
             description: Voice description
             language: Language of the voice
             tags: List of tags
+            created_at: ISO timestamp to record (defaults to now); bulk
+                imports can format it once and pass it to every voice
             **metadata: Additional metadata
             
         Returns:
@@ -223,43 +357,136 @@ class VoiceLibraryManager:
         
         voice_id = self.create_voice_id(name)
         
-        # Copy audio file to voice directory
+        # Store a canonical copy in the voice directory: the source may go
+        # away, and synthesis then always reads the same 24 kHz mono WAV.
+        # Sources already in that format are copied instead of converted.
         dest_path = self.voice_dir / f"{voice_id}.wav"
-        # In a real implementation, we'd copy and convert if needed
-        # For now, store the path
+        info = VoiceExtractor.get_audio_info(audio_path)
+        if (
+            Path(audio_path).suffix.lower() == ".wav"
+            and info is not None
+            and VoiceExtractor._can_copy(info, VOICE_SAMPLE_RATE, 1)
+        ):
+            shutil.copyfile(audio_path, dest_path)
+        elif not VoiceExtractor.extract_audio(audio_path, dest_path, sample_rate=VOICE_SAMPLE_RATE, channels=1):
+            dest_path.unlink(missing_ok=True)
+            return None
         
+        dest_info = VoiceExtractor.get_audio_info(dest_path) or {}
         profile = VoiceProfile(
             id=voice_id,
             name=name,
-            audio_path=str(audio_path),
-            created_at=datetime.now().isoformat(),
+            audio_path=str(dest_path),
+            created_at=created_at or datetime.now().isoformat(),
             description=description,
             source_file=source_file,
+            duration=dest_info.get("duration", 0.0),
+            sample_rate=VOICE_SAMPLE_RATE,
             language=language,
             tags=tags or [],
             metadata=metadata
         )
         
         if self.library.add_voice(profile):
+            self.version += 1
+            return profile
+        dest_path.unlink(missing_ok=True)
+        return None
+    
+    def add_voice(
+        self,
+        name: str,
+        description: Optional[str] = None,
+        gender: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Optional[VoiceProfile]:
+        """
+        Add a voice profile without reference audio
+        
+        Args:
+            name: Display name for the voice
+            description: Voice description
+            gender: Voice gender (stored in metadata)
+            metadata: Additional metadata
+            
+        Returns:
+            VoiceProfile if successful, None if the name is taken
+        """
+        metadata = dict(metadata or {})
+        if gender is not None:
+            metadata["gender"] = gender
+        
+        profile = VoiceProfile(
+            id=self.create_voice_id(name),
+            name=name,
+            audio_path="",
+            created_at=datetime.now().isoformat(),
+            description=description or "",
+            metadata=metadata
+        )
+        
+        if self.library.add_voice(profile):
+            self.version += 1
             return profile
         return None
     
+    def add_voices(self, profiles: List[VoiceProfile]) -> List[bool]:
+        """Add several voice profiles in one transaction (see VoiceLibrary.add_voices)"""
+        added = self.library.add_voices(profiles)
+        if any(added):
+            self.version += 1
+        return added
+    
     def get_voice(self, voice_id: str) -> Optional[VoiceProfile]:
         """Get voice by ID"""
         return self.library.get_voice(voice_id)
     
+    def get_voices(self, voice_ids: List[str]) -> Dict[str, VoiceProfile]:
+        """Get several voices by ID in one lookup (see VoiceLibrary.get_voices)"""
+        return self.library.get_voices(voice_ids)
+    
     def get_voice_by_name(self, name: str) -> Optional[VoiceProfile]:
         """Get voice by name"""
         return self.library.get_voice_by_name(name)
     
-    def list_voices(self) -> List[VoiceProfile]:
-        """List all voices"""
-        return self.library.list_voices()
+    def iter_voices(self) -> Iterator[VoiceProfile]:
+        """Iterate over voices, newest first"""
+        return self.library.iter_voices()
+    
+    def list_voices(self, limit: Optional[int] = None, offset: int = 0) -> List[VoiceProfile]:
+        """List voices, newest first (optionally one page of them)"""
+        return self.library.list_voices(limit, offset)
     
     def delete_voice(self, voice_id: str) -> bool:
-        """Delete a voice"""
-        return self.library.delete_voice(voice_id)
+        """Delete a voice, with the audio and conditioning files stored for it"""
+        voice = self.library.get_voice(voice_id)
+        deleted = self.library.delete_voice(voice_id)
+        if deleted:
+            self.version += 1
+            if voice is not None and voice.audio_path:
+                self._remove_voice_files(Path(voice.audio_path))
+        return deleted
+    
+    def _remove_voice_files(self, audio_path: Path):
+        """Remove a deleted voice's audio and its precomputed conditioning"""
+        # Only files in the voice directory are the library's own; profiles
+        # added with add_voices may point at audio kept elsewhere
+        if audio_path.parent.resolve() != self.voice_dir.resolve():
+            return
+        for path in (audio_path, speaker_conditioning_path(audio_path)):
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                # The row is gone either way; a leftover file is harmless
+                pass
     
     def update_voice(self, profile: VoiceProfile) -> bool:
         """Update a voice"""
-        return self.library.update_voice(profile)
+        updated = self.library.update_voice(profile)
+        if updated:
+            self.version += 1
+        return updated
+    
+    def mark_changed(self):
+        """Record a change to a voice's files (not its row), so cached views are rebuilt"""
+        self.version += 1
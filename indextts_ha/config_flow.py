@@ -3,6 +3,7 @@
 Handles configuration and setup of the IndexTTS integration through HA UI.
 """
 
+import asyncio
 import logging
 from typing import Any, Dict, Optional
 
@@ -12,6 +13,8 @@ from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_PORT
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import aiohttp
 
 _LOGGER = logging.getLogger(__name__)
@@ -20,6 +23,11 @@ DOMAIN = "indextts"
 CONF_API_URL = "api_url"
 CONF_DEFAULT_VOICE = "default_voice"
 
+# Health check: attempts, per-attempt timeout and overall budget (seconds)
+HEALTH_ATTEMPTS = 3
+HEALTH_ATTEMPT_TIMEOUT = 3
+HEALTH_TOTAL_TIMEOUT = 10
+
 
 class IndexTTSConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for IndexTTS."""
@@ -27,6 +35,17 @@ class IndexTTSConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
     
+    # Form schema, built once instead of on every (re)display of the form
+    USER_SCHEMA = vol.Schema(
+        {
+            vol.Required(
+                CONF_API_URL,
+                default="http://192.168.4.192:5150",
+            ): str,
+            vol.Optional(CONF_DEFAULT_VOICE, default="default"): str,
+        }
+    )
+    
     async def async_step_user(
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
@@ -38,20 +57,15 @@ class IndexTTSConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             try:
                 api_url = user_input.get(CONF_API_URL, "").rstrip("/")
                 
-                # Test connection
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        f"{api_url}/health",
-                        timeout=aiohttp.ClientTimeout(total=10),
-                    ) as resp:
-                        if resp.status == 200:
-                            health = await resp.json()
-                            _LOGGER.info(
-                                f"Connected to IndexTTS API at {api_url}: "
-                                f"{health.get('service')} v{health.get('version')}"
-                            )
-                        else:
-                            errors["base"] = "invalid_auth"
+                # Test connection (on HA's shared session)
+                session = async_get_clientsession(self.hass)
+                status = await asyncio.wait_for(
+                    _check_health(session, api_url), timeout=HEALTH_TOTAL_TIMEOUT
+                )
+                if status == 200:
+                    _LOGGER.info(f"Connected to IndexTTS API at {api_url}")
+                else:
+                    errors["base"] = "invalid_auth"
             
             except asyncio.TimeoutError:
                 errors["base"] = "timeout_connect"
@@ -71,15 +85,7 @@ class IndexTTSConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         
         return self.async_show_form(
             step_id="user",
-            data_schema=vol.Schema(
-                {
-                    vol.Required(
-                        CONF_API_URL,
-                        default="http://192.168.4.192:5150",
-                    ): str,
-                    vol.Optional(CONF_DEFAULT_VOICE, default="default"): str,
-                }
-            ),
+            data_schema=self.USER_SCHEMA,
             errors=errors,
             description_placeholders={
                 "example_url": "http://192.168.4.192:5150",
@@ -87,9 +93,31 @@ class IndexTTSConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
-# For config schema validation
-import asyncio
+async def _check_health(session: aiohttp.ClientSession, api_url: str) -> int:
+    """Probe /health, retrying with exponential backoff while the API is unreachable.
+    
+    Returns the HTTP status. A HEAD request proves liveness without a body to
+    download or decode; servers that reject HEAD are asked with GET instead.
+    Timeouts and connection errors are retried HEALTH_ATTEMPTS times before the
+    last one is raised.
+    """
+    timeout = aiohttp.ClientTimeout(total=HEALTH_ATTEMPT_TIMEOUT)
+    for attempt in range(HEALTH_ATTEMPTS):
+        try:
+            async with session.head(f"{api_url}/health", timeout=timeout) as resp:
+                if resp.status != 405:
+                    return resp.status
+            # Older API without HEAD support; the body itself is not needed
+            async with session.get(f"{api_url}/health", timeout=timeout) as resp:
+                return resp.status
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            if attempt == HEALTH_ATTEMPTS - 1:
+                raise
+            # A cold backend gets a moment to come up: 0.5 s, then 1 s
+            await asyncio.sleep(0.5 * 2 ** attempt)
 
+
+# For config schema validation
 CONFIG_SCHEMA = vol.Schema(
     {
         DOMAIN: vol.Schema(
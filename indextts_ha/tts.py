@@ -12,15 +12,26 @@ Features:
 """
 
 import asyncio
+from collections import OrderedDict
+import functools
+import hashlib
+import json
 import logging
-from typing import Optional, Dict, Any
+import os
+import time
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 import aiohttp
+import aiofiles
+import aiofiles.os
+import orjson
+import yarl
 
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, CONF_PORT, CONF_VOICE_ID
+from homeassistant.const import CONF_HOST, CONF_PORT, CONF_VOICE_ID, EVENT_HOMEASSISTANT_CLOSE
 from homeassistant.components.tts import PLATFORM_SCHEMA, Provider, TtsAudioType
+from homeassistant.helpers import config_validation as cv
 import voluptuous as vol
 
 _LOGGER = logging.getLogger(__name__)
@@ -29,12 +40,33 @@ DOMAIN = "indextts"
 CONF_API_URL = "api_url"
 CONF_DEFAULT_VOICE = "default_voice"
 CONF_CACHE_DIR = "cache_dir"
+CONF_INLINE_EMOTION_TAGS = "inline_emotion_tags"
+
+# Size cap of the audio cache; least recently used files are evicted beyond it
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Cache index saved on shutdown (key and size per file, least recently used first)
+CACHE_INDEX_FILE = "index.json"
+
+# Seconds a fetched voice list is reused before asking the API again
+VOICES_TTL = 300
+
+# Utterances requested within this many seconds are synthesized in one call
+BATCH_WINDOW = 0.02
+
+# Most utterances sent in one batch call (the API accepts up to 64)
+BATCH_MAX = 16
+
+# WAV is sent uncompressed unless asked for; aiohttp decodes gzip transparently
+AUDIO_ACCEPT_ENCODING = "gzip"
 
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
     {
         vol.Required(CONF_API_URL): cv.string,
         vol.Optional(CONF_DEFAULT_VOICE, default="default"): cv.string,
         vol.Optional(CONF_CACHE_DIR, default="tts_cache"): cv.string,
+        # Compatibility with servers that predate the "emotion" request field
+        vol.Optional(CONF_INLINE_EMOTION_TAGS, default=False): cv.boolean,
     }
 )
 
@@ -48,12 +80,141 @@ async def async_get_engine(
     api_url = config.get(CONF_API_URL, "http://localhost:5150")
     default_voice = config.get(CONF_DEFAULT_VOICE, "default")
     cache_dir = config.get(CONF_CACHE_DIR, "tts_cache")
+    inline_emotion_tags = config.get(CONF_INLINE_EMOTION_TAGS, False)
     
     # Ensure cache directory exists
     cache_path = Path(hass.config.path(cache_dir))
-    cache_path.mkdir(parents=True, exist_ok=True)
+    await hass.async_add_executor_job(
+        functools.partial(cache_path.mkdir, parents=True, exist_ok=True)
+    )
+    
+    cache_index = await hass.async_add_executor_job(_load_cache_index, cache_path)
+    provider = IndexTTSProvider(
+        hass, api_url, default_voice, cache_path, _create_api_session(), cache_index,
+        inline_emotion_tags=inline_emotion_tags,
+    )
+    
+    async def _close_session(event) -> None:
+        await provider.async_will_remove_from_hass()
     
-    return IndexTTSProvider(hass, api_url, default_voice, cache_path)
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _close_session)
+    return provider
+
+
+def _load_cache_index(cache_path: Path) -> "OrderedDict[str, int]":
+    """Index of the cached audio files: key -> size, least recently used first.
+    
+    Reuses the order saved on the last shutdown; files missing from it (or
+    everything, without a saved index) are treated as least recently used.
+    Entries whose file is gone are dropped.
+    """
+    on_disk = {
+        entry.name[:-len(".wav")]: entry
+        for entry in os.scandir(cache_path)
+        if entry.name.endswith(".wav")
+    }
+    saved: Dict[str, int] = {}
+    try:
+        with open(cache_path / CACHE_INDEX_FILE) as f:
+            for key, size in json.load(f):
+                if key in on_disk:
+                    saved[key] = int(size)
+    except (OSError, ValueError, TypeError):
+        pass
+    
+    index: "OrderedDict[str, int]" = OrderedDict(
+        (key, entry.stat().st_size) for key, entry in on_disk.items() if key not in saved
+    )
+    index.update(saved)
+    return index
+
+
+def _save_cache_index(cache_path: Path, entries: List[Tuple[str, int]]) -> None:
+    """Write the cache index for the next start (atomically)."""
+    tmp_path = cache_path / f"{CACHE_INDEX_FILE}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(entries, f)
+    os.replace(tmp_path, cache_path / CACHE_INDEX_FILE)
+
+
+def _normalize_text(text: str) -> str:
+    """Collapse runs of whitespace and trim, as templated messages often carry strays."""
+    return " ".join(text.split())
+
+
+def _create_api_session() -> aiohttp.ClientSession:
+    """Session dedicated to the IndexTTS API (a single backend host)."""
+    # Small pool for one host, idle sockets kept warm between utterances and
+    # DNS answers cached instead of resolved per connection
+    connector = aiohttp.TCPConnector(
+        limit=8,
+        limit_per_host=8,
+        keepalive_timeout=75,
+        enable_cleanup_closed=True,
+        ttl_dns_cache=300,
+    )
+    return aiohttp.ClientSession(connector=connector, connector_owner=True)
+
+
+class _BatchQueue:
+    """Coalesce utterances requested close together into one batch call."""
+    
+    def __init__(self, provider: "IndexTTSProvider"):
+        self._provider = provider
+        # cache file -> (request, future); duplicates share one entry
+        self._pending: Dict[str, Tuple[Dict[str, Any], asyncio.Future]] = {}
+        self._timer_armed = False
+    
+    async def synthesize(self, request: Dict[str, Any], dest: str) -> None:
+        """Synthesize a request into dest, together with utterances queued alongside it."""
+        entry = self._pending.get(dest)
+        if entry is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[dest] = (request, future)
+            if len(self._pending) >= BATCH_MAX:
+                self._flush()
+            elif not self._timer_armed:
+                self._timer_armed = True
+                self._provider.hass.async_create_task(self._flush_later())
+        else:
+            future = entry[1]
+        # A cancelled caller must not cancel the others waiting on this file
+        await asyncio.shield(future)
+    
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(BATCH_WINDOW)
+        self._timer_armed = False
+        self._flush()
+    
+    def _flush(self) -> None:
+        """Send everything queued so far."""
+        if self._pending:
+            batch, self._pending = self._pending, {}
+            self._provider.hass.async_create_task(self._send(batch))
+    
+    async def _send(self, batch: Dict[str, Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        items = [(request, dest) for dest, (request, _) in batch.items()]
+        results: List[Optional[BaseException]]
+        try:
+            if len(items) > 1 and await self._provider._synthesize_batch(items):
+                results = [None] * len(items)
+            else:
+                # One request per utterance, so a failing item (empty text,
+                # unknown voice) does not fail the others in its batch
+                results = await asyncio.gather(
+                    *(self._provider._synthesize(*item) for item in items),
+                    return_exceptions=True,
+                )
+        except Exception as err:
+            results = [err] * len(items)
+        
+        for (_, future), result in zip(batch.values(), results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(None)
 
 
 class IndexTTSProvider(Provider):
@@ -65,15 +226,45 @@ class IndexTTSProvider(Provider):
         api_url: str,
         default_voice: str,
         cache_path: Path,
+        session: aiohttp.ClientSession,
+        cache_index: Optional["OrderedDict[str, int]"] = None,
+        max_cache_bytes: int = CACHE_MAX_BYTES,
+        inline_emotion_tags: bool = False,
     ):
         """Initialize the TTS provider."""
         self.hass = hass
         self.api_url = api_url.rstrip("/")
+        # Endpoint URLs parsed once; aiohttp uses URL objects as they are
+        self._base_url = yarl.URL(self.api_url)
+        self._voices_url = self._base_url / "api/voices"
+        self._synth_url = self._base_url / "api/synthesize"
+        self._synth_batch_url = self._base_url / "api/synthesize/batch"
         self.default_voice = default_voice
         self.cache_path = cache_path
+        # Cache file paths are built as plain strings on the per-call path
+        self._cache_dir = os.fspath(cache_path)
         self.name = "IndexTTS"
+        # Send the emotion option as a text tag instead of the request field
+        self.inline_emotion_tags = inline_emotion_tags
         self._voices = {}
-        self._session: Optional[aiohttp.ClientSession] = None
+        # Single fetch in flight; the list is reused for VOICES_TTL seconds
+        self._voices_lock = asyncio.Lock()
+        self._voices_ts = 0.0
+        self._session = session
+        # cache key -> file size of every cached file, least recently used first
+        self._cache_index: OrderedDict[str, int] = cache_index or OrderedDict()
+        self._cache_bytes = sum(self._cache_index.values())
+        self._max_cache_bytes = max_cache_bytes
+        self._batch_queue = _BatchQueue(self)
+        # cache key -> synthesis in progress, shared by concurrent callers
+        self._inflight: Dict[str, asyncio.Task] = {}
+    
+    async def async_will_remove_from_hass(self) -> None:
+        """Close the API session and save the cache index for the next start."""
+        await self._session.close()
+        await self.hass.async_add_executor_job(
+            _save_cache_index, self.cache_path, list(self._cache_index.items())
+        )
     
     @property
     def supported_languages(self) -> list[str]:
@@ -87,8 +278,7 @@ class IndexTTSProvider(Provider):
     
     async def async_get_supported_voices(self, language: str) -> list[dict]:
         """Return list of available voices."""
-        if not self._voices:
-            await self._fetch_voices()
+        await self._fetch_voices()
         
         return [
             {
@@ -100,23 +290,27 @@ class IndexTTSProvider(Provider):
         ]
     
     async def _fetch_voices(self) -> None:
-        """Fetch available voices from IndexTTS API."""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.api_url}/api/voices",
+        """Fetch available voices from IndexTTS API (unless fetched recently)."""
+        async with self._voices_lock:
+            # Callers that waited on the lock reuse the list just fetched
+            if self._voices and time.monotonic() - self._voices_ts < VOICES_TTL:
+                return
+            try:
+                async with self._session.get(
+                    self._voices_url,
                     timeout=aiohttp.ClientTimeout(total=10),
                 ) as resp:
                     if resp.status == 200:
-                        data = await resp.json()
+                        data = orjson.loads(await resp.read())
                         self._voices = {
                             v["voice_id"]: v for v in data.get("voices", [])
                         }
+                        self._voices_ts = time.monotonic()
                         _LOGGER.debug(f"Fetched {len(self._voices)} voices from API")
                     else:
                         _LOGGER.error(f"Failed to fetch voices: {resp.status}")
-        except Exception as err:
-            _LOGGER.error(f"Error fetching voices: {err}")
+            except Exception as err:
+                _LOGGER.error(f"Error fetching voices: {err}")
     
     async def async_get_tts_audio(
         self,
@@ -129,81 +323,193 @@ class IndexTTSProvider(Provider):
         # Get voice ID from options or use default
         voice_id = options.get("voice", self.default_voice)
         
-        # Get emotion tags (if any) from options
+        # Get emotion (if any) from options
+        # emotion format: "emotion_name:intensity" e.g., "happy:80"
         emotion = options.get("emotion", "")
         
-        # Build text with emotion tags if provided
-        if emotion:
-            # Convert emotion option to tag format
-            # emotion format: "emotion_name:intensity" e.g., "happy:80"
-            text = f"[{emotion.title()}]{message}"
-        else:
-            text = message
-        
         # Create cache key
-        cache_key = self._get_cache_key(voice_id, text)
-        cache_file = self.cache_path / f"{cache_key}.wav"
+        cache_key = self._get_cache_key(voice_id, message, emotion)
+        cache_file = os.path.join(self._cache_dir, cache_key + ".wav")
         
-        # Return cached audio if available
-        if cache_file.exists():
+        # Return cached audio if available (the index lists every cached file)
+        if cache_key in self._cache_index:
+            self._cache_index.move_to_end(cache_key)
             _LOGGER.debug(f"Using cached audio: {cache_key}")
-            return (TtsAudioType.WAV, str(cache_file))
+            return (TtsAudioType.WAV, cache_file)
         
-        # Synthesize new audio
+        # Synthesize new audio; a call for audio already being synthesized
+        # waits for that synthesis instead of requesting it again
         try:
-            audio_data = await self._synthesize(voice_id, text)
+            task = self._inflight.get(cache_key)
+            if task is None:
+                request = self._build_request(voice_id, message, emotion)
+                task = self.hass.async_create_task(
+                    self._synthesize_to_cache(request, cache_key, cache_file)
+                )
+                self._inflight[cache_key] = task
+                task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+            # A cancelled caller must not cancel the others waiting on it
+            await asyncio.shield(task)
             
-            # Save to cache
-            cache_file.write_bytes(audio_data)
-            _LOGGER.debug(f"Cached new audio: {cache_key}")
-            
-            return (TtsAudioType.WAV, str(cache_file))
+            return (TtsAudioType.WAV, cache_file)
         
         except Exception as err:
             _LOGGER.error(f"Synthesis failed: {err}")
             raise
     
-    async def _synthesize(self, voice_id: str, text: str) -> bytes:
-        """Call IndexTTS API to synthesize speech."""
-        async with aiohttp.ClientSession() as session:
-            payload = {
-                "voice_id": voice_id,
-                "text": text,
-                "output_format": "wav",
-            }
-            
+    async def _synthesize_to_cache(
+        self, request: Dict[str, Any], cache_key: str, cache_file: str
+    ) -> None:
+        """Synthesize a request into the cache and index the file.
+        
+        Audio is streamed straight to disk, batched with other utterances
+        requested at the same time.
+        """
+        await self._batch_queue.synthesize(request, cache_file)
+        size = (await aiofiles.os.stat(cache_file)).st_size
+        await self._remember_cached(cache_key, size)
+        _LOGGER.debug(f"Cached new audio: {cache_key}")
+    
+    def _build_request(self, voice_id: str, message: str, emotion: str) -> Dict[str, Any]:
+        """API request body for one utterance."""
+        request = {
+            "voice_id": voice_id,
+            "text": message,
+            "output_format": "wav",
+            # Ask for the audio inline: one round trip instead of synthesize + download
+            "inline": True,
+        }
+        if emotion:
+            if self.inline_emotion_tags:
+                # Servers without the emotion field: tag the text instead
+                request["text"] = f"[{emotion.title()}]{message}"
+            else:
+                request["emotion"] = emotion
+        return request
+    
+    async def _synthesize(self, request: Dict[str, Any], dest: str) -> None:
+        """Call IndexTTS API to synthesize speech into dest."""
+        # Both requests reuse the pooled keep-alive connections
+        session = self._session
+        
+        try:
+            async with session.post(
+                self._synth_url,
+                data=orjson.dumps(request),
+                headers={
+                    "Accept": "audio/wav",
+                    "Accept-Encoding": AUDIO_ACCEPT_ENCODING,
+                    "Content-Type": "application/json",
+                },
+                timeout=aiohttp.ClientTimeout(total=60),
+            ) as resp:
+                if resp.status == 200 and resp.content_type.startswith("audio/"):
+                    await self._save_audio(resp, dest)
+                    return
+                if resp.status == 200:
+                    # Older API without inline audio: fetch the file it names
+                    result = orjson.loads(await resp.read())
+                    audio_file = result.get("audio_file")
+                    
+                    # Download audio from API
+                    async with session.get(
+                        f"{self.api_url}{audio_file}",
+                        headers={"Accept-Encoding": AUDIO_ACCEPT_ENCODING},
+                        timeout=aiohttp.ClientTimeout(total=30),
+                    ) as audio_resp:
+                        if audio_resp.status == 200:
+                            await self._save_audio(audio_resp, dest)
+                            return
+                    
+                    raise Exception(f"Failed to download audio: {audio_resp.status}")
+                else:
+                    error_detail = await resp.text()
+                    raise Exception(f"API error {resp.status}: {error_detail}")
+        
+        except asyncio.TimeoutError:
+            raise Exception("Synthesis timeout - API took too long to respond")
+    
+    async def _remember_cached(self, cache_key: str, size: int) -> None:
+        """Record a cached file and evict least recently used files beyond the size cap."""
+        self._cache_bytes += size - self._cache_index.get(cache_key, 0)
+        self._cache_index[cache_key] = size
+        self._cache_index.move_to_end(cache_key)
+        
+        # Never evict the file just written
+        while self._cache_bytes > self._max_cache_bytes and len(self._cache_index) > 1:
+            old_key, old_size = self._cache_index.popitem(last=False)
+            self._cache_bytes -= old_size
             try:
-                async with session.post(
-                    f"{self.api_url}/api/synthesize",
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=60),
-                ) as resp:
-                    if resp.status == 200:
-                        result = await resp.json()
-                        audio_file = result.get("audio_file")
-                        
-                        # Download audio from API
-                        async with session.get(
-                            f"{self.api_url}{audio_file}",
-                            timeout=aiohttp.ClientTimeout(total=30),
-                        ) as audio_resp:
-                            if audio_resp.status == 200:
-                                return await audio_resp.read()
-                        
-                        raise Exception(f"Failed to download audio: {audio_resp.status}")
-                    else:
-                        error_detail = await resp.text()
-                        raise Exception(f"API error {resp.status}: {error_detail}")
-            
-            except asyncio.TimeoutError:
-                raise Exception("Synthesis timeout - API took too long to respond")
+                await aiofiles.os.remove(os.path.join(self._cache_dir, old_key + ".wav"))
+            except FileNotFoundError:
+                pass
+    
+    async def _synthesize_batch(self, items: List[Tuple[Dict[str, Any], str]]) -> bool:
+        """Synthesize several (request, dest) utterances with one API call.
+        
+        Returns False when the items have to be sent one by one instead: the
+        API rejected the batch (one bad item fails the whole call) or
+        predates inline batches.
+        """
+        payload = [request for request, _ in items]
+        
+        try:
+            async with self._session.post(
+                self._synth_batch_url,
+                data=orjson.dumps(payload),
+                headers={
+                    "Accept-Encoding": AUDIO_ACCEPT_ENCODING,
+                    "Content-Type": "application/json",
+                },
+                timeout=aiohttp.ClientTimeout(total=60 * len(items)),
+            ) as resp:
+                lengths = resp.headers.get("X-Audio-Lengths")
+                if resp.status == 200 and lengths:
+                    # The audio files arrive back to back, in request order
+                    for (_, dest), length in zip(items, lengths.split(",")):
+                        await self._save_audio(resp, dest, int(length))
+                    return True
+                if resp.status not in (200, 404, 405):
+                    _LOGGER.warning(
+                        f"Batch synthesis failed ({resp.status}), retrying items one by one"
+                    )
+                return False
+        
+        except asyncio.TimeoutError:
+            raise Exception("Synthesis timeout - API took too long to respond")
+    
+    @staticmethod
+    async def _save_audio(
+        resp: aiohttp.ClientResponse, dest: str, length: Optional[int] = None
+    ) -> None:
+        """Stream a response body (or its next length bytes) to dest in 64 KiB chunks, published atomically."""
+        part = os.path.splitext(dest)[0] + ".part"
+        try:
+            async with aiofiles.open(part, "wb") as f:
+                if length is None:
+                    async for chunk in resp.content.iter_chunked(1 << 16):
+                        await f.write(chunk)
+                else:
+                    while length > 0:
+                        chunk = await resp.content.readexactly(min(length, 1 << 16))
+                        await f.write(chunk)
+                        length -= len(chunk)
+            await aiofiles.os.replace(part, dest)
+        except BaseException:
+            # Never leave a truncated file behind (or mistake it for cached audio)
+            if await aiofiles.os.path.exists(part):
+                await aiofiles.os.remove(part)
+            raise
     
-    def _get_cache_key(self, voice_id: str, text: str) -> str:
-        """Generate cache key for audio."""
-        import hashlib
+    def _get_cache_key(self, voice_id: str, message: str, emotion: str = "") -> str:
+        """Generate cache key for audio.
         
-        key_str = f"{voice_id}:{text}"
-        return hashlib.md5(key_str.encode()).hexdigest()
+        Messages differing only in whitespace, and emotion options differing
+        only in case, share a key. Letter case in the message is kept, like
+        the API's own cache, since it can change pronunciation (e.g. "US").
+        """
+        key_str = f"{voice_id}|{emotion.strip().lower()}|{_normalize_text(message)}"
+        return hashlib.blake2b(key_str.encode("utf-8"), digest_size=16).hexdigest()
 
 
 # For backward compatibility with older HA versions
@@ -0,0 +1,77 @@
+"""Shared fixtures for the indextts_app tests
+
+These tests exercise the API, cache, parser and voice library without the
+IndexTTS2 model: synthesis goes through StubSynthesizer, which writes a short
+sine-wave WAV instead of running inference.
+"""
+
+import math
+import struct
+import uuid
+import wave
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# Scripts that load the real model (run by hand, see their docstrings)
+collect_ignore = ["regression_test.py", "padding_test.py"]
+
+SAMPLE_RATE = 24000
+
+
+def write_wav(path: Path, seconds: float = 0.5, sample_rate: int = SAMPLE_RATE) -> Path:
+    """Write a mono 16-bit sine-wave WAV"""
+    frames = int(seconds * sample_rate)
+    samples = (int(8000 * math.sin(2 * math.pi * 440 * i / sample_rate)) for i in range(frames))
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b"".join(struct.pack("<h", s) for s in samples))
+    return Path(path)
+
+
+class StubSynthesizer:
+    """Stands in for TTSSynthesizer; records the calls it receives"""
+
+    def __init__(self, out_dir: Path, seconds: float = 0.5):
+        self.out_dir = Path(out_dir)
+        self.seconds = seconds
+        self.calls = []
+
+    def synthesize_segments(self, texts, emotion_matrix, voice_audio_path, output_path=None, output_format="wav"):
+        from indextts_app.utils import SynthesisResult, speaker_conditioning_path
+
+        self.calls.append((list(texts), emotion_matrix.copy(), Path(voice_audio_path), output_format))
+        # Like TTSSynthesizer, save the voice's conditioning on first use
+        speaker_conditioning_path(voice_audio_path).touch()
+        path = self.out_dir / f"out_{uuid.uuid4().hex}.{output_format}"
+        # Only WAV can be produced without an encoder; other formats still
+        # carry WAV data, which is enough for the cache and routes
+        write_wav(path, self.seconds)
+        return SynthesisResult(success=True, audio_path=str(path), sample_rate=SAMPLE_RATE)
+
+
+@pytest.fixture
+def voice_manager(tmp_path):
+    from indextts_app.voice_library import VoiceLibraryManager
+
+    return VoiceLibraryManager(tmp_path / "voices")
+
+
+@pytest.fixture
+def voice(voice_manager):
+    """A voice with reference audio, registered without ffmpeg"""
+    from indextts_app.voice_library import VoiceProfile
+
+    voice_id = voice_manager.create_voice_id("ref")
+    audio_path = write_wav(voice_manager.voice_dir / f"{voice_id}.wav")
+    profile = VoiceProfile(
+        id=voice_id,
+        name="ref",
+        audio_path=str(audio_path),
+        created_at=datetime.now().isoformat(),
+    )
+    assert voice_manager.add_voices([profile]) == [True]
+    return profile
@@ -0,0 +1,259 @@
+"""Behaviour tests for the API routes, with a stub synthesizer instead of IndexTTS2"""
+
+from contextlib import asynccontextmanager
+
+import msgpack
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from indextts_app.api.batching import synthesis_pool
+from indextts_app.api.cache import SynthesisCache
+from indextts_app.api.deps import get_voice_manager
+from indextts_app.api.routes import extract_multipart, health, synthesize, voices
+
+from conftest import StubSynthesizer
+
+MSGPACK = {"Accept": "application/msgpack"}
+
+
+@pytest.fixture
+def synth(tmp_path):
+    out_dir = tmp_path / "synth"
+    out_dir.mkdir()
+    return StubSynthesizer(out_dir)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, synth, voice_manager):
+    monkeypatch.setattr(extract_multipart, "UPLOAD_DIR", tmp_path / "uploads")
+    # GET /voices keeps its encoded body at module level
+    monkeypatch.setattr(voices, "_cached_list", None)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.synth = synth
+        app.state.synthesis_cache = SynthesisCache(tmp_path / "cache")
+        synthesis_pool.start()
+        yield
+        await synthesis_pool.stop()
+
+    app = FastAPI(lifespan=lifespan)
+    for module in (health, synthesize, extract_multipart, voices):
+        app.include_router(module.router, prefix="/api")
+    app.dependency_overrides[get_voice_manager] = lambda: voice_manager
+    with TestClient(app) as client:
+        yield client
+
+
+# Synthesis
+
+def test_synthesize_returns_metadata(client, voice):
+    resp = client.post("/api/synthesize", json={"voice_id": voice.id, "text": "[Happy:80]Hello"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["duration"] == pytest.approx(0.5)
+    assert body["emotion_vector"] == [80, 0, 0, 0, 0, 0, 0, 0]
+
+
+def test_emotion_vector_covers_every_segment(client, voice):
+    resp = client.post("/api/synthesize", json={"voice_id": voice.id, "text": "[Happy:80]Hello![Calm:60] How are you?"})
+    assert resp.status_code == 200
+    assert resp.json()["emotion_vector"] == [80, 0, 0, 0, 0, 0, 0, 60]
+
+
+def test_emotion_field_applies_to_whole_text(client, voice, synth):
+    resp = client.post("/api/synthesize", json={"voice_id": voice.id, "text": "Hello", "emotion": "Calm:60"})
+    assert resp.status_code == 200
+    assert resp.json()["emotion_vector"] == [0, 0, 0, 0, 0, 0, 0, 60]
+    assert synth.calls[0][0] == ["Hello"]
+
+
+def test_identical_requests_synthesize_once(client, voice, synth):
+    request = {"voice_id": voice.id, "text": "Coffee is ready"}
+    first = client.post("/api/synthesize", json=request).json()
+    # Speed is not applied, so it must not split the cache either
+    second = client.post("/api/synthesize", json={**request, "speed": 1.5}).json()
+    assert first["audio_file"] == second["audio_file"]
+    assert len(synth.calls) == 1
+
+
+def test_non_wav_output_is_cached_under_its_format(client, voice):
+    request = {"voice_id": voice.id, "text": "Hello", "output_format": "mp3"}
+    for _ in range(2):
+        resp = client.post("/api/synthesize", json=request)
+        assert resp.status_code == 200
+        assert resp.json()["audio_file"].endswith(".mp3")
+
+
+def test_unsupported_format_is_rejected(client, voice, synth):
+    resp = client.post("/api/synthesize", json={"voice_id": voice.id, "text": "Hi", "output_format": "xyz"})
+    assert resp.status_code == 400
+    assert not synth.calls
+
+
+def test_unknown_voice_is_404(client):
+    resp = client.post("/api/synthesize", json={"voice_id": "nope", "text": "Hi"})
+    assert resp.status_code == 404
+
+
+def test_voice_without_audio_is_rejected(client, voice_manager):
+    profile = voice_manager.add_voice("No audio")
+    resp = client.post("/api/synthesize", json={"voice_id": profile.id, "text": "Hi"})
+    assert resp.status_code == 400
+    resp = client.post("/api/synthesize/stream", json={"voice_id": profile.id, "text": "Hi"})
+    assert resp.status_code == 400
+
+
+def test_inline_audio(client, voice):
+    resp = client.post(
+        "/api/synthesize",
+        json={"voice_id": voice.id, "text": "Hi", "inline": True},
+        headers={"Accept-Encoding": "identity"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "audio/wav"
+    assert resp.headers["x-audio-duration"] == "0.500"
+    assert "content-encoding" not in resp.headers
+    assert resp.content[:4] == b"RIFF"
+
+
+@pytest.mark.parametrize("accept_encoding, gzipped", [
+    ("gzip", True),
+    ("deflate, gzip;q=0.5", True),
+    ("gzip;q=0", False),
+    ("*", True),
+    ("br, *;q=0", False),
+])
+def test_inline_audio_gzip_follows_accept_encoding(client, voice, accept_encoding, gzipped):
+    resp = client.post(
+        "/api/synthesize",
+        json={"voice_id": voice.id, "text": "Hi", "inline": True},
+        headers={"Accept-Encoding": accept_encoding},
+    )
+    assert resp.status_code == 200
+    assert (resp.headers.get("content-encoding") == "gzip") == gzipped
+    # The test client decodes gzip, so the body is the WAV either way
+    assert resp.content[:4] == b"RIFF"
+
+
+def test_inline_batch_concatenates_audio(client, voice):
+    items = [{"voice_id": voice.id, "text": text, "inline": True} for text in ("One", "Two")]
+    resp = client.post("/api/synthesize/batch", json=items)
+    assert resp.status_code == 200
+    lengths = [int(n) for n in resp.headers["x-audio-lengths"].split(",")]
+    assert sum(lengths) == len(resp.content)
+    assert resp.content[:4] == b"RIFF"
+    assert resp.content[lengths[0]:lengths[0] + 4] == b"RIFF"
+
+
+def test_voice_list_reports_conditioning_saved_by_synthesis(client, voice):
+    before = client.get("/api/voices")
+    assert before.json()["voices"][0]["embedding_cached"] is False
+
+    assert client.post("/api/synthesize", json={"voice_id": voice.id, "text": "Hi"}).status_code == 200
+    after = client.get("/api/voices", headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.json()["voices"][0]["embedding_cached"] is True
+
+
+def test_batch_returns_results_in_order(client, voice):
+    items = [{"voice_id": voice.id, "text": f"[Happy:{n}]Hi"} for n in (10, 20, 30)]
+    resp = client.post("/api/synthesize/batch", json=items)
+    assert resp.status_code == 200
+    assert [r["emotion_vector"][0] for r in resp.json()] == [10, 20, 30]
+
+
+# Health and MessagePack
+
+def test_health_json_and_msgpack(client):
+    json_resp = client.get("/api/health")
+    msgpack_resp = client.get("/api/health", headers=MSGPACK)
+    assert json_resp.json()["status"] == "healthy"
+    assert msgpack.unpackb(msgpack_resp.content)["status"] == "healthy"
+    assert json_resp.headers["etag"] != msgpack_resp.headers["etag"]
+    assert json_resp.headers["vary"] == msgpack_resp.headers["vary"] == "Accept"
+
+
+@pytest.mark.parametrize("headers", [{}, MSGPACK])
+def test_health_head(client, headers):
+    resp = client.head("/api/health", headers=headers)
+    assert resp.status_code == 200
+    assert resp.content == b""
+
+
+def test_health_etag_is_per_format(client):
+    etag = client.get("/api/health").headers["etag"]
+    assert client.get("/api/health", headers={"If-None-Match": etag}).status_code == 304
+    # The JSON ETag must not validate the MessagePack representation
+    resp = client.get("/api/health", headers={**MSGPACK, "If-None-Match": etag})
+    assert resp.status_code == 200
+
+    msgpack_etag = resp.headers["etag"]
+    resp = client.get("/api/health", headers={**MSGPACK, "If-None-Match": msgpack_etag})
+    assert resp.status_code == 304
+
+
+def test_json_route_re_encoded_as_msgpack(client):
+    resp = client.get("/api/health/ready", headers=MSGPACK)
+    assert resp.headers["content-type"] == "application/msgpack"
+    assert "accept" in resp.headers["vary"].lower()
+    assert msgpack.unpackb(resp.content)["ready"] is True
+
+
+def test_msgpack_request_body(client, voice):
+    resp = client.post(
+        "/api/synthesize",
+        content=msgpack.packb({"voice_id": voice.id, "text": "Hi"}),
+        headers={"Content-Type": "application/msgpack", **MSGPACK},
+    )
+    assert resp.status_code == 200
+    assert msgpack.unpackb(resp.content)["format"] == "wav"
+
+
+# Resumable uploads
+
+def _start_upload(client, name="clip"):
+    resp = client.post("/api/extract/uploads", json={"filename": f"{name}.wav", "voice_name": name})
+    assert resp.status_code == 201
+    return resp.json()["upload_id"]
+
+
+def test_upload_lists_received_parts(client):
+    upload_id = _start_upload(client)
+    client.put(f"/api/extract/uploads/{upload_id}/parts/1", content=b"b")
+    client.put(f"/api/extract/uploads/{upload_id}/parts/0", content=b"a")
+    assert client.get(f"/api/extract/uploads/{upload_id}").json()["parts"] == [0, 1]
+    assert not list((extract_multipart.UPLOAD_DIR / upload_id).glob("*.tmp"))
+
+
+def test_part_size_must_match_content_range(client):
+    upload_id = _start_upload(client)
+    resp = client.put(
+        f"/api/extract/uploads/{upload_id}/parts/0",
+        content=b"abc",
+        headers={"Content-Range": "bytes 0-9/10"},
+    )
+    assert resp.status_code == 400
+    assert client.get(f"/api/extract/uploads/{upload_id}").json()["parts"] == []
+
+
+def test_missing_parts_block_completion(client):
+    upload_id = _start_upload(client)
+    client.put(f"/api/extract/uploads/{upload_id}/parts/1", content=b"b")
+    resp = client.post(f"/api/extract/uploads/{upload_id}/complete")
+    assert resp.status_code == 400
+
+
+def test_failed_completion_keeps_the_parts(client):
+    upload_id = _start_upload(client)
+    client.put(f"/api/extract/uploads/{upload_id}/parts/0", content=b"not audio")
+    resp = client.post(f"/api/extract/uploads/{upload_id}/complete")
+    # 400 when the decoder rejects the data, 500 when no decoder is installed
+    assert resp.status_code in (400, 500)
+    # The client can replace the bad part and complete again
+    assert client.get(f"/api/extract/uploads/{upload_id}").json()["parts"] == [0]
+
+
+def test_unknown_upload_is_404(client):
+    assert client.get(f"/api/extract/uploads/{'0' * 32}").status_code == 404
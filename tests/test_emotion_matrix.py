@@ -0,0 +1,48 @@
+"""Tests for emotion tag parsing into vectors and matrices"""
+
+import numpy as np
+import pytest
+
+from indextts_app.emotion import EMOTION_ORDER, EmotionTagParser, parse_emotion_tags_to_matrix
+from indextts_app.emotion.parser import _iter_tags
+
+
+def test_matrix_has_one_row_per_segment():
+    texts, matrix = parse_emotion_tags_to_matrix("[Happy:80]Great news![Calm:60]Take your time.")
+    assert texts == ["Great news!", "Take your time."]
+    assert matrix.shape == (2, len(EMOTION_ORDER))
+    assert matrix.dtype == np.float32
+    assert matrix[0, EMOTION_ORDER.index("happy")] == pytest.approx(0.8)
+    assert matrix[1, EMOTION_ORDER.index("calm")] == pytest.approx(0.6)
+
+
+def test_combined_emotions_share_a_row():
+    _, matrix = parse_emotion_tags_to_matrix("[Calm:60,Happy:40]Waiting")
+    assert matrix[0, EMOTION_ORDER.index("calm")] == pytest.approx(0.6)
+    assert matrix[0, EMOTION_ORDER.index("happy")] == pytest.approx(0.4)
+
+
+def test_untagged_text_is_neutral():
+    texts, matrix = parse_emotion_tags_to_matrix("Just text")
+    assert texts == ["Just text"]
+    assert not matrix.any()
+
+
+def test_repeated_parse_returns_equal_results():
+    # The second call is served by the parser's lru_cache
+    first = parse_emotion_tags_to_matrix("[Sad:30]Again")
+    second = parse_emotion_tags_to_matrix("[Sad:30]Again")
+    assert first[0] == second[0]
+    np.testing.assert_array_equal(first[1], second[1])
+
+
+@pytest.mark.parametrize("text", [
+    "[Happy:80]a[Calm:60]b",
+    "no tags",
+    "[] empty [ unclosed",
+    "[x][y]]z[",
+    "[[nested]]",
+])
+def test_tag_scanner_matches_the_regex(text):
+    expected = [(m.start(), m.end(), m.group(1)) for m in EmotionTagParser.TAG_PATTERN.finditer(text)]
+    assert list(_iter_tags(text)) == expected
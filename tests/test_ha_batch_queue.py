@@ -0,0 +1,67 @@
+"""Tests for the Home Assistant integration's batch queue"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from indextts_ha.tts import _BatchQueue  # noqa: E402
+
+
+class FakeHass:
+    def async_create_task(self, coro):
+        return asyncio.get_running_loop().create_task(coro)
+
+
+class FakeProvider:
+    """Records API calls; the batch endpoint answers batch_ok"""
+
+    def __init__(self, batch_ok=True, bad_text=None):
+        self.hass = FakeHass()
+        self.batch_ok = batch_ok
+        self.bad_text = bad_text
+        self.single_calls = []
+        self.batch_calls = []
+
+    async def _synthesize(self, request, dest):
+        self.single_calls.append(request["text"])
+        if request["text"] == self.bad_text:
+            raise Exception("API error 400: Text is empty")
+
+    async def _synthesize_batch(self, items):
+        self.batch_calls.append([request["text"] for request, _ in items])
+        return self.batch_ok
+
+
+def _run(provider, texts):
+    queue = _BatchQueue(provider)
+
+    async def main():
+        return await asyncio.gather(
+            *(queue.synthesize({"text": text}, f"/cache/{text}.wav") for text in texts),
+            return_exceptions=True,
+        )
+
+    return asyncio.run(main())
+
+
+def test_requests_in_one_window_share_a_batch_call():
+    provider = FakeProvider()
+    assert _run(provider, ["a", "b", "c"]) == [None, None, None]
+    assert provider.batch_calls == [["a", "b", "c"]]
+    assert provider.single_calls == []
+
+
+def test_duplicate_requests_share_one_entry():
+    provider = FakeProvider()
+    assert _run(provider, ["a", "a"]) == [None, None]
+    assert provider.single_calls == ["a"]
+
+
+def test_failing_item_does_not_fail_its_batch():
+    provider = FakeProvider(batch_ok=False, bad_text="")
+    results = _run(provider, ["a", "", "b"])
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], Exception)
+    assert sorted(provider.single_calls) == ["", "a", "b"]
@@ -0,0 +1,61 @@
+"""Tests for storing precomputed speaker conditioning next to voice audio"""
+
+import numpy as np
+
+from indextts_app.utils import TTSSynthesizer, speaker_conditioning_path
+
+from conftest import write_wav
+
+
+class FakeTensor:
+    """Just enough of a torch tensor for the conditioning writer"""
+
+    def __init__(self, value):
+        self.value = np.full(2, value, dtype=np.float32)
+
+    def detach(self):
+        return self
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.value
+
+
+class FakeModel:
+    cache_spk_audio_prompt = None
+    cache_emo_audio_prompt = None
+
+    def get_speaker_conditioning(self, prompt):
+        return FakeTensor(1), FakeTensor(2), FakeTensor(3), FakeTensor(4)
+
+    def get_emotion_conditioning(self, prompt):
+        return FakeTensor(5)
+
+
+def _synthesizer():
+    # Only the model attribute is used, so skip loading checkpoints
+    synth = TTSSynthesizer.__new__(TTSSynthesizer)
+    synth.model = FakeModel()
+    return synth
+
+
+def test_conditioning_is_saved_next_to_the_audio(tmp_path):
+    audio = write_wav(tmp_path / "voice.wav")
+    path = _synthesizer().precompute_speaker_conditioning(audio)
+    assert path == speaker_conditioning_path(audio)
+    with np.load(path) as data:
+        assert data["emo_cond"][0] == 5
+
+
+def test_failed_save_is_not_fatal(tmp_path):
+    # The conditioning file cannot be created in a missing directory
+    audio = tmp_path / "gone" / "voice.wav"
+    synth = _synthesizer()
+    assert synth.precompute_speaker_conditioning(audio) is None
+
+    synth._prepare_voice(audio)
+    # The freshly encoded tensors still seed the model's speaker cache
+    assert synth.model.cache_spk_audio_prompt == str(audio)
+    assert synth.model.cache_emo_cond.value[0] == 5
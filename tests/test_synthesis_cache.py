@@ -0,0 +1,75 @@
+"""Tests for the synthesized audio cache"""
+
+import asyncio
+
+from indextts_app.api.cache import SynthesisCache, synthesis_cache_key
+
+
+def _produced(tmp_path, name, suffix=".wav"):
+    path = tmp_path / f"{name}{suffix}"
+    path.write_bytes(name.encode())
+    return path
+
+
+def test_key_ignores_whitespace_but_not_emotions():
+    base = synthesis_cache_key("v", "Hello  world ", [0.8] + [0.0] * 7)
+    assert base == synthesis_cache_key("v", "Hello world", [0.8] + [0.0] * 7)
+    assert base != synthesis_cache_key("v", "Hello world", [0.5] + [0.0] * 7)
+    assert base != synthesis_cache_key("v", "Hello world", [0.8] + [0.0] * 7, output_format="mp3")
+
+
+def test_put_and_get(tmp_path):
+    cache = SynthesisCache(tmp_path / "cache")
+    path = cache.put("k", _produced(tmp_path, "a"))
+    assert path == cache.cache_dir / "k.wav"
+    assert cache.get("k") == path
+    assert cache.get("missing") is None
+
+
+def test_entries_keep_their_format(tmp_path):
+    cache = SynthesisCache(tmp_path / "cache")
+    path = cache.put("k", _produced(tmp_path, "a", ".mp3"))
+    assert path.suffix == ".mp3"
+    assert cache.get("k", ".mp3") == path
+    assert cache.get("k", ".wav") is None
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = SynthesisCache(tmp_path / "cache", max_entries=2)
+    cache.put("a", _produced(tmp_path, "a"))
+    cache.put("b", _produced(tmp_path, "b"))
+    cache.get("a")
+    cache.put("c", _produced(tmp_path, "c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert sorted(p.name for p in cache.cache_dir.iterdir()) == ["a.wav", "c.wav"]
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    cache = SynthesisCache(tmp_path / "cache")
+    cache.put("a", _produced(tmp_path, "a"))
+    assert SynthesisCache(tmp_path / "cache").get("a") is not None
+
+
+def test_file_removed_behind_the_cache_is_a_miss(tmp_path):
+    cache = SynthesisCache(tmp_path / "cache")
+    cache.put("a", _produced(tmp_path, "a")).unlink()
+    assert cache.get("a") is None
+
+
+def test_concurrent_misses_share_one_producer(tmp_path):
+    cache = SynthesisCache(tmp_path / "cache")
+    calls = []
+
+    async def produce():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return _produced(tmp_path, f"p{len(calls)}")
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_synth("k", produce) for _ in range(5)))
+
+    paths = asyncio.run(main())
+    assert len(calls) == 1
+    assert len(set(paths)) == 1
@@ -0,0 +1,86 @@
+"""Tests for the synthesis request pool"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from indextts_app.api.batching import SynthesisPool
+
+
+def test_submit_without_loop_runs_the_job():
+    async def main():
+        return await SynthesisPool().submit("v", lambda: 42)
+
+    assert asyncio.run(main()) == 42
+
+
+def test_queued_jobs_are_grouped_by_voice():
+    order = []
+    gate = threading.Event()
+
+    def job(name):
+        def run():
+            if name == "first":
+                # Hold the worker until everything else is queued
+                gate.wait(5)
+            order.append(name)
+            return name
+        return run
+
+    async def main():
+        pool = SynthesisPool()
+        pool.start()
+        try:
+            first = asyncio.ensure_future(pool.submit("a", job("first")))
+            await asyncio.sleep(0.05)
+            rest = [
+                asyncio.ensure_future(pool.submit(voice, job(f"{voice}{i}")))
+                for i, voice in enumerate(["a", "b", "a", "b"])
+            ]
+            await asyncio.sleep(0.05)
+            gate.set()
+            return await asyncio.gather(first, *rest)
+        finally:
+            await pool.stop()
+
+    results = asyncio.run(main())
+    assert results == ["first", "a0", "b1", "a2", "b3"]
+    # Queued jobs ran voice by voice
+    assert order == ["first", "a0", "a2", "b1", "b3"]
+
+
+def test_jobs_never_overlap():
+    running = []
+    overlaps = []
+
+    def job():
+        running.append(1)
+        overlaps.append(len(running) > 1)
+        time.sleep(0.01)
+        running.pop()
+
+    async def main():
+        pool = SynthesisPool()
+        pool.start()
+        try:
+            await asyncio.gather(*(pool.submit(voice, job) for voice in "abcabc"))
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+    assert overlaps == [False] * 6
+
+
+def test_job_errors_reach_the_caller():
+    async def main():
+        pool = SynthesisPool()
+        pool.start()
+        try:
+            await pool.submit("v", lambda: 1 / 0)
+        finally:
+            await pool.stop()
+
+    with pytest.raises(ZeroDivisionError):
+        asyncio.run(main())
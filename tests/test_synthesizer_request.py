@@ -0,0 +1,28 @@
+"""Tests for the synthesizer's request type"""
+
+import numpy as np
+import pytest
+
+from indextts_app.utils import SynthesisRequest
+
+
+def test_list_emotion_vector_becomes_float32_array():
+    request = SynthesisRequest(text="Hi", voice_id="v", emotion_vector=[0.5] * 8)
+    assert isinstance(request.emotion_vector, np.ndarray)
+    assert request.emotion_vector.dtype == np.float32
+    assert request.emotion_vector.flags.writeable
+
+
+def test_read_only_array_is_copied():
+    vector = np.zeros(8, dtype=np.float32)
+    vector.flags.writeable = False
+    request = SynthesisRequest(text="Hi", voice_id="v", emotion_vector=vector)
+    assert request.emotion_vector.flags.writeable
+
+
+def test_tensor_emotion_vector_is_kept():
+    torch = pytest.importorskip("torch")
+    # synthesize_segments passes rows of a matrix already on the model device
+    row = torch.zeros(2, 8)[0]
+    request = SynthesisRequest(text="Hi", voice_id="v", emotion_vector=row)
+    assert request.emotion_vector is row
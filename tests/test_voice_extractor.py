@@ -0,0 +1,57 @@
+"""Tests for probing and extracting media files"""
+
+import asyncio
+
+from indextts_app.voice_library import VoiceExtractor
+
+from conftest import write_wav
+
+
+def test_probe_results_are_memoized(tmp_path, monkeypatch):
+    path = write_wav(tmp_path / "clip.wav")
+    calls = []
+
+    def probe(file_path):
+        calls.append(file_path)
+        return {"duration": 0.5, "sample_rate": 24000, "channels": 1, "codec_name": "pcm_s16le"}
+
+    monkeypatch.setattr(VoiceExtractor, "_probe_audio_info", staticmethod(probe))
+    assert VoiceExtractor.get_audio_info(path)["duration"] == 0.5
+    assert VoiceExtractor.get_audio_info(path)["duration"] == 0.5
+    assert len(calls) == 1
+
+
+def test_failed_probe_is_retried(tmp_path, monkeypatch):
+    path = write_wav(tmp_path / "clip.wav")
+    results = [None, {"duration": 0.5, "sample_rate": 24000, "channels": 1, "codec_name": "pcm_s16le"}]
+
+    # The first probe times out, the next one succeeds
+    monkeypatch.setattr(VoiceExtractor, "_probe_audio_info", staticmethod(lambda file_path: results.pop(0)))
+    assert VoiceExtractor.get_audio_info(path) is None
+    assert VoiceExtractor.get_audio_info(path)["duration"] == 0.5
+
+
+def test_async_extraction_shares_the_probe(tmp_path, monkeypatch):
+    from indextts_app.voice_library import extractor
+
+    path = write_wav(tmp_path / "clip.wav")
+    probes = []
+    commands = []
+
+    def probe(file_path):
+        probes.append(file_path)
+        return {"duration": 0.5, "sample_rate": 24000, "channels": 1, "codec_name": "pcm_s16le"}
+
+    async def run(cmd, timeout):
+        commands.append(cmd[0])
+        return 0, ""
+
+    # Take the ffmpeg CLI path without running ffmpeg
+    monkeypatch.setattr(extractor, "av", None)
+    monkeypatch.setattr(VoiceExtractor, "_probe_audio_info", staticmethod(probe))
+    monkeypatch.setattr(VoiceExtractor, "_run_async", staticmethod(run))
+
+    assert asyncio.run(VoiceExtractor.extract_audio_async(path, tmp_path / "out.wav"))
+    assert VoiceExtractor.get_audio_info(path) is not None
+    assert len(probes) == 1
+    assert commands == ["ffmpeg"]
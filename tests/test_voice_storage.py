@@ -0,0 +1,125 @@
+"""Tests for the SQLite voice library"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from indextts_app.utils import speaker_conditioning_path
+from indextts_app.voice_library import VoiceLibraryManager, VoiceProfile
+
+from conftest import write_wav
+
+
+def _profiles(manager, count):
+    start = datetime(2024, 1, 1)
+    return [
+        VoiceProfile(
+            id=manager.create_voice_id(f"v{i}"),
+            name=f"v{i}",
+            audio_path="",
+            created_at=(start + timedelta(minutes=i)).isoformat(),
+            tags=[f"t{i}"],
+            metadata={"i": i},
+        )
+        for i in range(count)
+    ]
+
+
+def test_add_and_get_round_trip(voice_manager):
+    profile = voice_manager.add_voice("Sarah", description="Friendly", gender="female")
+    stored = voice_manager.get_voice(profile.id)
+    assert stored.name == "Sarah"
+    assert stored.description == "Friendly"
+    assert stored.metadata == {"gender": "female"}
+    assert voice_manager.get_voice_by_name("Sarah").id == profile.id
+
+
+def test_duplicate_name_is_rejected(voice_manager):
+    assert voice_manager.add_voice("Sarah") is not None
+    assert voice_manager.add_voice("Sarah") is None
+
+
+def test_ids_are_unique(voice_manager):
+    ids = {voice_manager.create_voice_id("same") for _ in range(1000)}
+    assert len(ids) == 1000
+
+
+def test_add_voices_reports_each_profile(voice_manager):
+    first, second = _profiles(voice_manager, 2)
+    taken_name = VoiceProfile(
+        id=voice_manager.create_voice_id("x"), name="v0", audio_path="", created_at=first.created_at
+    )
+    version = voice_manager.version
+    assert voice_manager.add_voices([first, taken_name, second]) == [True, False, True]
+    assert voice_manager.version == version + 1
+    assert voice_manager.add_voices([first]) == [False]
+    assert voice_manager.version == version + 1
+
+
+def test_list_voices_pages_newest_first(voice_manager):
+    profiles = _profiles(voice_manager, 5)
+    assert all(voice_manager.add_voices(profiles))
+    newest_first = [p.name for p in reversed(profiles)]
+
+    assert [v.name for v in voice_manager.list_voices()] == newest_first
+    assert [v.name for v in voice_manager.list_voices(limit=2)] == newest_first[:2]
+    assert [v.name for v in voice_manager.list_voices(limit=2, offset=2)] == newest_first[2:4]
+    assert [v.name for v in voice_manager.list_voices(offset=4)] == newest_first[4:]
+    assert [v.name for v in voice_manager.iter_voices()] == newest_first
+
+
+def test_json_fields_decode_on_access(voice_manager):
+    profile = _profiles(voice_manager, 1)[0]
+    voice_manager.add_voices([profile])
+    stored = voice_manager.get_voice(profile.id)
+    assert stored.tags == ["t0"]
+    assert stored.metadata == {"i": 0}
+
+
+def test_get_voices_spans_query_chunks(voice_manager):
+    # More IDs than one IN (...) query takes
+    profiles = _profiles(voice_manager, 950)
+    assert all(voice_manager.add_voices(profiles))
+    ids = [p.id for p in profiles] + ["unknown"]
+
+    found = voice_manager.get_voices(ids)
+    assert set(found) == {p.id for p in profiles}
+    assert found[profiles[-1].id].name == profiles[-1].name
+
+
+def test_delete_voice(voice_manager):
+    profile = voice_manager.add_voice("Temp")
+    assert voice_manager.delete_voice(profile.id)
+    assert voice_manager.get_voice(profile.id) is None
+    assert not voice_manager.delete_voice(profile.id)
+
+
+def test_delete_voice_removes_its_files(voice_manager, voice, tmp_path):
+    audio = Path(voice.audio_path)
+    conditioning = speaker_conditioning_path(audio)
+    conditioning.touch()
+    outside = write_wav(tmp_path / "outside.wav")
+    kept = VoiceProfile(
+        id=voice_manager.create_voice_id("kept"), name="kept", audio_path=str(outside), created_at=voice.created_at
+    )
+    voice_manager.add_voices([kept])
+
+    assert voice_manager.delete_voice(voice.id)
+    assert not audio.exists() and not conditioning.exists()
+    # Audio outside the voice directory is not the library's to remove
+    assert voice_manager.delete_voice(kept.id)
+    assert outside.exists()
+
+
+def test_library_reopens_from_disk(tmp_path):
+    VoiceLibraryManager(tmp_path).add_voice("Kept")
+    assert VoiceLibraryManager(tmp_path).get_voice_by_name("Kept") is not None
+
+
+def test_threads_see_each_others_writes(voice_manager):
+    # Each thread keeps its own connection to the library
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        added = list(pool.map(voice_manager.add_voice, [f"v{i}" for i in range(8)]))
+        names = pool.submit(lambda: {v.name for v in voice_manager.list_voices()}).result()
+    assert all(added)
+    assert names == {f"v{i}" for i in range(8)}